@@ -0,0 +1,96 @@
+"""Arsip event yang sudah lewat: pindahkan seats/bookings/payments ke tabel *_archive.
+
+Event ditandai archived_at dulu (book_seats menolak), lalu baris dipindah per
+batch dalam transaksi pendek: INSERT ... SELECT ke arsip, DELETE dari tabel
+panas. Tabel yang dipindai & dikunci jalur booking jadi hanya berisi inventori
+yang masih dijual. Aman dihentikan kapan saja; jalankan lagi untuk melanjutkan.
+
+    python archive.py [--days 7] [--batch 1000] [--event ID]
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import delete, exists, insert, or_, select, update
+
+import db_crud
+from models import Event, Booking, Seat, Payment, BookingArchive, SeatArchive, PaymentArchive
+
+ARCHIVE_AFTER_DAYS = 7   # event diarsip setelah tanggalnya lewat sekian hari
+ARCHIVE_BATCH = 1000     # booking (atau kursi kosong) per transaksi
+
+class ArchiveResult(NamedTuple):
+    bookings: int
+    seats: int
+    payments: int
+
+def _move(session, src, dst, cond) -> int:
+    """INSERT INTO dst SELECT ... FROM src WHERE cond; DELETE FROM src WHERE cond."""
+    cols = [c.name for c in dst.__table__.columns]
+    session.execute(insert(dst).from_select(cols, select(*(src.__table__.c[c] for c in cols)).where(cond)))
+    return session.execute(delete(src).where(cond).execution_options(synchronize_session=False)).rowcount
+
+def archive_event(event_id, batch_size=ARCHIVE_BATCH, progress=None) -> ArchiveResult:
+    """Pindahkan semua data satu event ke arsip. progress(hasil_sejauh_ini) dipanggil per batch."""
+    session = db_crud.Session()
+    try:
+        if not session.get(Event, event_id): raise ValueError("Event tidak ditemukan.")
+        session.execute(update(Event).where(Event.id == event_id, Event.archived_at == None)
+                        .values(archived_at=datetime.now()).execution_options(synchronize_session=False))
+        session.commit()
+        db_crud.event_cache.invalidate(event_id)
+        db_crud.seat_map_cache.invalidate(event_id)
+
+        done = ArchiveResult(0, 0, 0)
+        while True:
+            # Booking + kursi + payment-nya pindah bersama; baris dikunci supaya reaper/refund menunggu
+            ids = session.scalars(select(Booking.id).where(Booking.event_id == event_id)
+                                  .order_by(Booking.id).limit(batch_size).with_for_update()).all()
+            if ids:
+                payments = _move(session, Payment, PaymentArchive, Payment.booking_id.in_(ids))
+                seats = _move(session, Seat, SeatArchive, Seat.booking_id.in_(ids))
+                _move(session, Booking, BookingArchive, Booking.id.in_(ids))
+                done = ArchiveResult(done.bookings + len(ids), done.seats + seats, done.payments + payments)
+            else:
+                # Sisa kursi yang tidak pernah terjual
+                seat_ids = session.scalars(select(Seat.id).where(Seat.event_id == event_id)
+                                           .order_by(Seat.id).limit(batch_size).with_for_update()).all()
+                if not seat_ids: break
+                done = done._replace(seats=done.seats + _move(session, Seat, SeatArchive, Seat.id.in_(seat_ids)))
+            session.commit()
+            if progress: progress(done)
+        return done
+    except Exception:
+        session.rollback(); raise
+    finally: session.close()
+
+def finished_events(before=None) -> list[int]:
+    """Event yang tanggalnya < before dan belum diarsip, atau arsipnya belum selesai."""
+    before = before or datetime.now() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    leftover = or_(exists().where(Seat.event_id == Event.id), exists().where(Booking.event_id == Event.id))
+    session = db_crud.Session()
+    try:
+        return list(session.scalars(select(Event.id).where(Event.date < before, or_(Event.archived_at == None, leftover))
+                                    .order_by(Event.id)))
+    finally: session.close()
+
+def archive_finished_events(before=None, batch_size=ARCHIVE_BATCH, progress=None) -> dict[int, ArchiveResult]:
+    return {event_id: archive_event(event_id, batch_size, progress) for event_id in finished_events(before)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Arsip event yang sudah selesai")
+    ap.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="arsip event yang lewat > N hari")
+    ap.add_argument("--batch", type=int, default=ARCHIVE_BATCH)
+    ap.add_argument("--event", type=int, help="arsip satu event ini saja")
+    args = ap.parse_args()
+    show = lambda r: print(f"⏳ {r.bookings} booking | {r.seats} kursi | {r.payments} payment dipindah...")
+    if args.event is not None:
+        results = {args.event: archive_event(args.event, args.batch, show)}
+    else:
+        results = archive_finished_events(datetime.now() - timedelta(days=args.days), args.batch, show)
+    for event_id, r in results.items():
+        print(f"✅ Event {event_id}: {r.bookings} booking, {r.seats} kursi, {r.payments} payment diarsip")
+    if not results: print("✅ Tidak ada event yang perlu diarsip.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Varian asyncio dari service layer db_crud (SQLAlchemy asyncio).
+
+PostgreSQL lewat asyncpg, SQLite lewat aiosqlite. Satu worker bisa melayani
+banyak request booking bersamaan karena I/O database tidak memblok event loop.
+Fungsi di sini tidak print/input: hasil di-return, kegagalan di-raise ValueError.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import db_crud
+from db_engine import engine_kwargs
+from event_cache import EventSnapshot
+from db_crud import (BookingResult, HOLD_TTL, VALID_ROLES, check_password, claim_seats_stmt,
+                     event_counters_stmt, event_cache, generate_booking_code,
+                     hash_password, hold_expired, is_valid_code, outbox_row, refund_payment_stmt,
+                     release_seats_stmt, seat_map_cache, sell_seats_stmt)
+from models import User, Event, Booking, Payment, Seat, OutboxEvent
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+def async_url(url: str):
+    """postgresql://... -> postgresql+asyncpg://..., sqlite://... -> sqlite+aiosqlite://..."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+async_engine = create_async_engine(async_url(db_crud.config.url),
+                                   **engine_kwargs(db_crud.config.url, db_crud.config, is_async=True))
+AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+# bcrypt (hash & verifikasi) selalu di thread, bukan di event loop. BCRYPT_THREADS > 0: pool
+# sendiri dengan ukuran itu, supaya login massal tidak menghabiskan executor default.
+BCRYPT_THREADS = int(os.environ.get("BCRYPT_THREADS", 0))
+_bcrypt_pool = ThreadPoolExecutor(BCRYPT_THREADS, thread_name_prefix="bcrypt") if BCRYPT_THREADS else None
+
+async def _bcrypt(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool, fn, *args)
+
+# ===============================================
+# [1] USER
+# ===============================================
+async def register_user(name, email, pwd, role, phone=None) -> int:
+    if role not in VALID_ROLES: raise ValueError("Role tidak valid")
+    # bcrypt melepas GIL, jadi hashing di thread tidak menahan event loop
+    hashed = await _bcrypt(hash_password, pwd)
+    async with AsyncSession() as session:
+        try:
+            u = User(name=name, email=email, role=role, password=hashed, phone_number=phone)
+            session.add(u)
+            await session.commit()
+            return u.id
+        except IntegrityError:
+            await session.rollback()
+            raise ValueError("Email sudah terdaftar.")
+
+async def authenticate_admin(email, pwd) -> User | None:
+    """Login admin; verifikasi bcrypt di thread pool, event loop tetap melayani request lain."""
+    async with AsyncSession() as session:
+        user = await session.scalar(select(User).where(User.email == email))
+    if not user or user.role != 'Admin': return None
+    return user if await _bcrypt(check_password, pwd, user.password) else None
+
+# ===============================================
+# [2] EVENT
+# ===============================================
+async def get_event(event_id, session=None) -> EventSnapshot | None:
+    """Read-through event_cache; miss dibaca lewat session async supaya event loop tidak terblok.
+
+    session: pakai session caller (yang sudah memegang koneksi) daripada membuka koneksi kedua.
+    """
+    snap = event_cache.peek(event_id)
+    if snap is None:
+        if session is not None: event = await session.get(Event, event_id)
+        else:
+            async with AsyncSession() as own:
+                event = await own.get(Event, event_id)
+        if event is None: return None
+        snap = EventSnapshot.from_model(event)
+        event_cache.put(snap)
+    return snap
+
+async def list_events() -> list[Event]:
+    async with AsyncSession() as session:
+        return list(await session.scalars(select(Event).order_by(Event.date)))
+
+# ===============================================
+# [3] BOOKING
+# ===============================================
+async def book_seats(email, event_id, qty) -> BookingResult:
+    if qty < 1: raise ValueError("Jumlah tiket minimal 1.")
+    # Sesekali mengambil blok id baru dari DB (I/O sync, koneksi sendiri): di thread, sebelum session dibuka
+    code = await asyncio.to_thread(generate_booking_code)
+
+    async with AsyncSession() as session:
+        async with session.begin():
+            user_id = await session.scalar(select(User.id).where(User.email == email))
+            event = await get_event(event_id, session)
+            if not user_id or not event: raise ValueError("User/Event invalid.")
+            if event.status == 'Cancelled': raise ValueError("Event sudah dibatalkan.")
+            if event.archived_at: raise ValueError("Event sudah selesai (diarsip).")
+
+            hold_until = datetime.now() + timedelta(seconds=HOLD_TTL)
+            new_bk = Booking(customer_id=user_id, event_id=event.id, quantity=qty, total_price=event.ticket_price * qty,
+                             booking_code=code, status='Pending', hold_expires_at=hold_until)
+            session.add(new_bk)
+            await session.flush()
+
+            stmt = claim_seats_stmt(async_engine.dialect, event.id, qty, new_bk.id)
+            seat_lbls = list(await session.scalars(stmt.returning(Seat.seat_label)))
+            if len(seat_lbls) < qty:
+                raise ValueError(f"Kursi kurang! Sisa: {len(seat_lbls)}")
+
+            # Harga dibaca di transaksi ini (snapshot cache bisa basi), lihat db_crud.sell_seats_stmt
+            price = await session.scalar(sell_seats_stmt(event.id, qty))
+            if price is None: raise ValueError("Event sudah dibatalkan/diarsip.")
+            new_bk.total_price = total = price * qty
+            await session.execute(insert(OutboxEvent), [outbox_row(event.id, 'booked', code, seats=seat_lbls)])
+
+    seat_map_cache.mark(event_id, seat_lbls, True)
+    return BookingResult(code, seat_lbls, total, hold_until)
+
+async def cancel_booking(code) -> list[str]:
+    """Batalkan booking Pending, return label kursi yang dilepas."""
+    if not is_valid_code(code): raise ValueError("Kode booking tidak valid.")
+    async with AsyncSession() as session:
+        async with session.begin():
+            # Update bersyarat: aman kalau bersamaan dengan pembayaran
+            bk = (await session.execute(
+                update(Booking).where(Booking.booking_code == code, Booking.status == 'Pending')
+                .values(status='Cancelled').returning(Booking.id, Booking.event_id)
+                .execution_options(synchronize_session=False))).first()
+            if not bk: raise ValueError("Tidak bisa cancel.")
+
+            released = list(await session.scalars(release_seats_stmt(bk.id).returning(Seat.seat_label)))
+            stmt = event_counters_stmt(bk.event_id, booked=-len(released))
+            if stmt is not None: await session.execute(stmt)
+            await session.execute(insert(OutboxEvent), [outbox_row(bk.event_id, 'cancelled', code, seats=released)])
+
+    seat_map_cache.mark(bk.event_id, released, False)
+    return released
+
+# ===============================================
+# [4] PAYMENT
+# ===============================================
+async def pay_booking(code, amount, method) -> int:
+    """Bayar booking Pending, return id Payment."""
+    if not is_valid_code(code): raise ValueError("Kode booking tidak valid.")
+    async with AsyncSession() as session:
+        async with session.begin():
+            bk = await session.scalar(select(Booking).where(Booking.booking_code == code).with_for_update())
+            if not bk or bk.status != 'Pending': raise ValueError("Invalid booking.")
+            if hold_expired(bk): raise ValueError("Waktu hold booking sudah habis.")
+            if amount < bk.total_price: raise ValueError("Uang kurang.")
+
+            pay = Payment(booking_id=bk.id, amount=amount, payment_method=method, status='Success')
+            session.add(pay)
+            bk.status = 'Confirmed'
+            await session.execute(insert(OutboxEvent), [outbox_row(bk.event_id, 'paid', code, amount=amount)])
+        return pay.id
+
+async def refund_payment(pay_id) -> list[str]:
+    """Refund payment, batalkan booking-nya, return label kursi yang dilepas."""
+    async with AsyncSession() as session:
+        async with session.begin():
+            pay = (await session.execute(refund_payment_stmt(pay_id))).first()
+            if not pay:
+                status = await session.scalar(select(Payment.status).where(Payment.id == pay_id))
+                raise ValueError("Payment not found." if status is None else f"Payment berstatus {status}, tidak bisa direfund.")
+
+            bk = await session.get(Booking, pay.booking_id)
+            released = []
+            if bk:
+                bk.status = 'Cancelled'
+                released = list(await session.scalars(release_seats_stmt(bk.id).returning(Seat.seat_label)))
+                stmt = event_counters_stmt(bk.event_id, booked=-len(released))
+                if stmt is not None: await session.execute(stmt)
+                await session.execute(insert(OutboxEvent), [outbox_row(bk.event_id, 'refunded', bk.booking_code,
+                                                                       seats=released, amount=pay.amount)])
+
+    if bk: seat_map_cache.mark(bk.event_id, released, False)
+    return released
@@ -0,0 +1,148 @@
+"""Generator kode booking unik tanpa round trip DB per kode.
+
+Setiap proses mengambil blok id (default 1000) dari tabel id_blocks dengan satu
+UPDATE ... RETURNING, lalu membagikan id dari blok itu di memori. Id diacak
+dengan permutasi Feistel 40-bit berkunci (bijektif, jadi tetap unik tapi tidak
+berurutan/mudah ditebak), di-encode ke 8 karakter base32 Crockford, ditambah
+1 karakter check digit (Luhn mod 32): BKG-XXXXXXXXC.
+
+Kode lama (random, 6 karakter) tidak mungkin bentrok karena panjangnya beda.
+
+Keamanan: kode booking adalah bearer token (cancel/bayar cukup dengan kode),
+jadi id berurutan hanya boleh terlihat acak bagi yang TIDAK tahu key. Putaran
+Feistel memakai BLAKE2b berkunci (PRF), sehingga kode yang diamati pembeli
+tidak membocorkan key. BOOKING_CODE_KEY wajib di-set (rahasia, sama di semua
+proses); tanpa key generator menolak membuat kode, kecuali TICKET_ENV=dev/test.
+Mengganti key = permutasi baru: kode lama tetap berlaku, bentrok dengan kode
+baru sangat jarang (~n_lama * n_baru / 2^40) dan ditolak unique constraint.
+"""
+import hashlib
+import os
+import threading
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from models import IdBlock
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32 (tanpa I, L, O, U)
+BODY_LEN = 8                                   # 8 x 5 bit = 40 bit
+BLOCK_NAME = 'booking_code'
+BLOCK_SIZE = int(os.environ.get("BOOKING_CODE_BLOCK", 1000))
+BOOKING_CODE_KEY = os.environ.get("BOOKING_CODE_KEY")
+DEV_KEY = "dev-only-booking-code-key"  # hanya dipakai kalau TICKET_ENV=dev/test
+
+_HALF_BITS = BODY_LEN * 5 // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+
+def _round_keys(key: str, rounds=4) -> list[bytes]:
+    """Key turunan per putaran (dipakai sebagai key BLAKE2b)."""
+    return [hashlib.blake2b(key.encode('utf-8'), digest_size=32, person=b"bkg-round%d" % i).digest()
+            for i in range(rounds)]
+
+def _round(k: bytes, right: int) -> int:
+    digest = hashlib.blake2b(right.to_bytes(3, 'big'), digest_size=3, key=k).digest()
+    return int.from_bytes(digest, 'big') & _HALF_MASK
+
+def permute(n: int, keys) -> int:
+    """Permutasi Feistel 4 putaran dengan PRF berkunci atas [0, 2^40), bijektif."""
+    left, right = n >> _HALF_BITS, n & _HALF_MASK
+    for k in keys:
+        left, right = right, left ^ _round(k, right)
+    return (left << _HALF_BITS) | right
+
+def resolve_key(key=None, env=None) -> str:
+    """Key dari argumen / BOOKING_CODE_KEY; fallback DEV_KEY hanya untuk TICKET_ENV=dev/test."""
+    env = os.environ if env is None else env
+    key = key or env.get("BOOKING_CODE_KEY")
+    if key: return key
+    if env.get("TICKET_ENV", "").lower() in ("dev", "test"): return DEV_KEY
+    raise RuntimeError("BOOKING_CODE_KEY belum di-set: kode booking bisa ditebak tanpa key rahasia "
+                       "(set TICKET_ENV=dev untuk development).")
+
+def _luhn_digit(factor, v):
+    addend = factor * v
+    return addend // 32 + addend % 32
+
+# Tabel per 10 bit (2 karakter): string + kontribusi Luhn, supaya encode cukup 4 lookup
+_PAIRS = [(ALPHABET[v >> 5] + ALPHABET[v & 31], _luhn_digit(1, v >> 5) + _luhn_digit(2, v & 31))
+          for v in range(1024)]
+
+def encode(n: int) -> str:
+    """40 bit -> 8 karakter base32 + 1 check digit (hasil sama dengan body + check_char(body))."""
+    d, c, b, a = _PAIRS[n >> 30 & 1023], _PAIRS[n >> 20 & 1023], _PAIRS[n >> 10 & 1023], _PAIRS[n & 1023]
+    total = a[1] + b[1] + c[1] + d[1]
+    return d[0] + c[0] + b[0] + a[0] + ALPHABET[(32 - total % 32) % 32]
+
+def check_char(body: str) -> str:
+    """Check digit Luhn mod 32: menangkap semua salah ketik 1 karakter & kebanyakan tukar posisi."""
+    total, factor = 0, 2
+    for c in reversed(body):
+        total += _luhn_digit(factor, _INDEX[c])
+        factor = 1 if factor == 2 else 2
+    return ALPHABET[(32 - total % 32) % 32]
+
+def is_valid_code(code: str) -> bool:
+    """Validasi format + check digit tanpa query DB (kode lama BKG-XXXXXX dianggap valid)."""
+    if not isinstance(code, str) or not code.startswith("BKG-"): return False
+    tail = code[4:].upper()
+    if len(tail) == 6: return tail.isalnum()
+    if len(tail) != BODY_LEN + 1 or any(c not in _INDEX for c in tail): return False
+    return check_char(tail[:-1]) == tail[-1]
+
+def allocate_block(engine, size, name=BLOCK_NAME) -> int:
+    """Ambil blok [start, start + size) dalam transaksi sendiri yang singkat."""
+    while True:
+        with engine.begin() as conn:
+            end = conn.execute(update(IdBlock).where(IdBlock.name == name)
+                               .values(next_value=IdBlock.next_value + size)
+                               .returning(IdBlock.next_value)).scalar()
+            if end is not None: return end - size
+        try:
+            # Baris counter belum ada (DB baru tanpa migrasi)
+            with engine.begin() as conn:
+                conn.execute(insert(IdBlock).values(name=name, next_value=1 + size))
+            return 1
+        except IntegrityError:
+            continue  # proses lain baru saja membuatnya; ulangi UPDATE
+
+class BookingCodeGenerator:
+    """Thread-safe; blok di-reset setelah fork supaya proses anak tidak memakai blok induk."""
+
+    def __init__(self, engine_getter, block_size=BLOCK_SIZE, key=BOOKING_CODE_KEY):
+        self.engine_getter = engine_getter
+        self.block_size = block_size
+        self.key = key
+        self._keys = None  # diturunkan saat kode pertama dibuat: modul tanpa booking tetap bisa jalan tanpa key
+        self._lock = threading.Lock()
+        self._next = self._end = 0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def reset(self):
+        """Buang blok id di memori (ganti database); menunggu next_id() yang sedang berjalan."""
+        with self._lock:
+            self._next = self._end = 0
+
+    def _after_fork(self):
+        # Anak hanya punya satu thread; lock bisa ikut tersalin dalam keadaan terkunci
+        self._lock = threading.Lock()
+        self._next = self._end = 0
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next >= self._end:
+                self._next = allocate_block(self.engine_getter(), self.block_size)
+                self._end = self._next + self.block_size
+            n = self._next
+            self._next += 1
+            return n
+
+    @property
+    def keys(self):
+        if self._keys is None: self._keys = _round_keys(resolve_key(self.key))
+        return self._keys
+
+    def __call__(self) -> str:
+        keys = self.keys  # gagal sebelum mengambil id kalau key belum di-set
+        return f"BKG-{encode(permute(self.next_id(), keys))}"
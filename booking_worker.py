@@ -0,0 +1,182 @@
+"""Worker booking dengan group commit: banyak reservasi kecil dalam satu transaksi.
+
+Request masuk antrian; tiap worker thread mengambil sampai `max_batch` request
+(menunggu paling lama `max_wait` detik untuk mengumpulkan), mengelompokkan per
+event, lalu per event dalam SATU transaksi:
+
+    1 query user (IN), 1 SELECT kursi kosong (FOR UPDATE SKIP LOCKED di PostgreSQL),
+    1 INSERT booking (executemany), 1 UPDATE kursi (CASE id -> booking_id),
+    1 UPDATE counter event, 1 INSERT outbox (executemany), 1 commit
+
+Setiap pemanggil tetap mendapat Future sendiri: request yang tidak kebagian kursi
+atau user-nya tidak valid gagal sendiri tanpa membatalkan yang lain. Kalau
+transaksi grup gagal (konflik, error DB), request diproses ulang satu per satu
+lewat db_crud.book_seats.
+
+    worker = BookingWorker(threads=4)
+    res = worker.book("a@x", event_id, 2)     # atau worker.submit(...) -> Future
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import case, insert, select, update
+
+import db_crud
+from db_crud import BookingResult, HOLD_TTL, outbox_row, sell_seats_stmt, tracked, write_outbox
+from models import User, Booking, Seat
+
+MAX_BATCH = 64       # request per pengambilan antrian
+MAX_WAIT = 0.002     # detik menunggu request lain sebelum batch diproses
+GROUP_RETRIES = 3    # ulangi transaksi grup kalau kursi direbut transaksi lain
+
+class BookingRequest(NamedTuple):
+    email: str
+    event_id: int
+    qty: int
+    adjacent: bool
+    future: Future
+
+class _SeatConflict(Exception):
+    """Kursi yang dipilih sudah diklaim transaksi lain (SQLite / tanpa SKIP LOCKED)."""
+
+def _fail(req, exc):
+    if not req.future.done(): req.future.set_exception(exc)
+
+@tracked(name="book_group")
+def book_group(event_id, reqs) -> None:
+    """Layani semua request satu event dalam satu transaksi; hasil/eksepsi diset ke Future masing-masing."""
+    reqs = [r for r in reqs if not r.future.done()]  # percobaan ulang: yang sudah gagal tidak diulang
+    event = db_crud.event_cache.get(event_id)
+    if not event or event.status == 'Cancelled' or event.archived_at:
+        msg = "User/Event invalid." if not event else "Event sudah dibatalkan/diarsip."
+        for r in reqs: _fail(r, ValueError(msg))
+        return
+
+    # Kode dibuat sebelum session dibuka: isi ulang blok id memakai koneksi sendiri
+    codes = [db_crud.generate_booking_code() for _ in reqs]
+    session = db_crud.Session()
+    try:
+        users = dict(session.execute(select(User.email, User.id).where(User.email.in_({r.email for r in reqs}))).all())
+        live = []
+        for r in reqs:
+            if r.qty < 1: _fail(r, ValueError("Jumlah tiket minimal 1."))
+            elif r.email not in users: _fail(r, ValueError("User/Event invalid."))
+            else: live.append(r)
+        if not live: return
+
+        # Satu SELECT untuk kursi semua request, lalu dibagi FIFO (yang tidak muat dilewati)
+        free = (select(Seat.id, Seat.seat_label).where(Seat.event_id == event_id, Seat.is_booked == False)
+                .order_by(Seat.id).limit(sum(r.qty for r in live)))
+        if session.get_bind().dialect.name == 'postgresql':
+            free = free.with_for_update(skip_locked=True)
+        seats = session.execute(free).all()
+        served, pos = [], 0
+        for r in live:
+            if pos + r.qty <= len(seats):
+                served.append((r, seats[pos:pos + r.qty]))
+                pos += r.qty
+            else: _fail(r, ValueError(f"Kursi kurang! Sisa: {len(seats) - pos}"))
+        if not served: return
+
+        hold_until = datetime.now() + timedelta(seconds=HOLD_TTL)
+        rows = [{"customer_id": users[r.email], "event_id": event_id, "quantity": r.qty,
+                 "total_price": event.ticket_price * r.qty, "booking_code": code,
+                 "status": 'Pending', "hold_expires_at": hold_until} for (r, _), code in zip(served, codes)]
+        ids = session.scalars(insert(Booking).returning(Booking.id, sort_by_parameter_order=True), rows).all()
+
+        owner = {seat_id: booking_id for (_, taken), booking_id in zip(served, ids) for seat_id, _ in taken}
+        claimed = session.execute(
+            update(Seat).where(Seat.id.in_(owner), Seat.is_booked == False)
+            .values(is_booked=True, booking_id=case(owner, value=Seat.id))
+            .returning(Seat.id).execution_options(synchronize_session=False)).all()
+        if len(claimed) != len(owner): raise _SeatConflict()
+
+        price = session.scalar(sell_seats_stmt(event_id, sum(r.qty for r, _ in served)))
+        if price is None: raise ValueError("Event sudah dibatalkan/diarsip.")
+        if price != event.ticket_price:  # snapshot basi: total dihitung ulang dari harga di transaksi ini
+            session.execute(update(Booking).where(Booking.id.in_(ids)).values(total_price=Booking.quantity * price)
+                            .execution_options(synchronize_session=False))
+            for row in rows: row["total_price"] = price * row["quantity"]
+        write_outbox(session, *(outbox_row(event_id, 'booked', row["booking_code"], seats=[label for _, label in taken])
+                                for (_, taken), row in zip(served, rows)))
+        session.commit()
+    except Exception:
+        session.rollback(); raise
+    finally: session.close()
+
+    labels = [label for _, taken in served for _, label in taken]
+    db_crud.seat_map_cache.mark(event_id, labels, True)
+    for (r, taken), row in zip(served, rows):
+        r.future.set_result(BookingResult(row["booking_code"], [label for _, label in taken],
+                                          row["total_price"], hold_until))
+
+def _book_one(req):
+    try: req.future.set_result(db_crud.book_seats(req.email, req.event_id, req.qty, req.adjacent))
+    except Exception as e: _fail(req, e)
+
+class BookingWorker:
+    def __init__(self, threads=4, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._threads = [threading.Thread(target=self._run, name=f"booking-worker-{i}", daemon=True)
+                         for i in range(threads)]
+        for t in self._threads: t.start()
+        self.batches = self.requests = self.fallbacks = 0
+
+    def submit(self, email, event_id, qty, adjacent=False) -> Future:
+        fut = Future()
+        self._queue.put(BookingRequest(email, event_id, qty, adjacent, fut))
+        return fut
+
+    def book(self, email, event_id, qty, adjacent=False, timeout=None) -> BookingResult:
+        return self.submit(email, event_id, qty, adjacent).result(timeout)
+
+    def stop(self):
+        for _ in self._threads: self._queue.put(None)
+        for t in self._threads: t.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try: req = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty: break
+            if req is None:
+                self._queue.put(None)  # sinyal stop untuk diri sendiri di putaran berikutnya
+                break
+            batch.append(req)
+        return batch
+
+    def _serve(self, event_id, reqs):
+        for attempt in range(GROUP_RETRIES):
+            try:
+                book_group(event_id, reqs)
+                return
+            except _SeatConflict:
+                continue
+            except Exception:
+                break
+        # Isolasi error: proses satu per satu, kegagalan hanya mengenai request-nya sendiri
+        self.fallbacks += 1
+        for r in reqs:
+            if not r.future.done(): _book_one(r)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None: return
+            batch = self._collect(first)
+            self.batches += 1
+            self.requests += len(batch)
+
+            groups = {}
+            for r in batch:
+                if r.adjacent: _book_one(r)  # blok berdampingan butuh klaim per request
+                else: groups.setdefault(r.event_id, []).append(r)
+            for event_id, reqs in groups.items():
+                self._serve(event_id, reqs)
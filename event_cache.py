@@ -0,0 +1,169 @@
+"""Cache katalog event (read-through, TTL + LRU).
+
+Event jarang berubah, jadi jalur booking & daftar event membaca snapshot dari
+sini; DB hanya dibaca saat miss/kedaluwarsa. Fungsi tulis di db_crud
+(create/update/delete/cancel event, generate kursi) memanggil invalidate().
+
+Backend bisa diganti:
+    MemoryBackend  per proses (default, juga untuk test)
+    RedisBackend   dibagi antar proses; aktif kalau EVENT_CACHE_URL=redis://...
+                   (butuh paket `redis`)
+
+Counter kursi di snapshot bisa tertinggal sampai EVENT_CACHE_TTL detik; angka
+pasti tetap dari seat_map_cache dan klaim kursi di DB.
+"""
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import select
+
+from models import Event
+
+EVENT_CACHE_TTL = float(os.environ.get("EVENT_CACHE_TTL", 30))  # detik
+MAX_ENTRIES = 1024
+CATALOG_KEY = "events:all"
+
+class EventSnapshot(NamedTuple):
+    """Salinan baris Event yang lepas dari session (aman dibagi antar thread)."""
+    id: int
+    admin_id: int
+    name: str
+    description: str | None
+    date: datetime
+    venue: str
+    ticket_price: Decimal
+    total_capacity: int
+    seats_total: int
+    seats_booked: int
+    status: str
+    archived_at: datetime | None
+
+    @classmethod
+    def from_model(cls, event: Event) -> "EventSnapshot":
+        return cls(*(getattr(event, f) for f in cls._fields))
+
+    @property
+    def seats_available(self):
+        return self.seats_total - self.seats_booked
+
+class MemoryBackend:
+    """Dict LRU dengan waktu kedaluwarsa per key, thread-safe."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None: return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys: self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock: self._data.clear()
+
+class RedisBackend:
+    """Backend bersama antar proses; TTL & eviksi (maxmemory-policy allkeys-lru) oleh Redis."""
+
+    def __init__(self, url, prefix="ticket:"):
+        import redis  # dependensi opsional
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), px=int(ttl * 1000))
+
+    def delete(self, *keys):
+        if keys: self.client.delete(*(self.prefix + k for k in keys))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "event*"))
+        if keys: self.client.delete(*keys)
+
+def backend_from_env(env=None):
+    env = os.environ if env is None else env
+    url = env.get("EVENT_CACHE_URL")
+    return RedisBackend(url) if url else MemoryBackend()
+
+class EventCache:
+    def __init__(self, session_factory, backend=None, ttl=EVENT_CACHE_TTL):
+        self.session_factory = session_factory
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _key(event_id):
+        return f"event:{event_id}"
+
+    def peek(self, event_id) -> EventSnapshot | None:
+        """Snapshot dari cache tanpa menyentuh DB (None kalau miss)."""
+        snap = self.backend.get(self._key(event_id))
+        if snap is None: self.misses += 1
+        else: self.hits += 1
+        return snap
+
+    def put(self, snap: EventSnapshot):
+        self.backend.set(self._key(snap.id), snap, self.ttl)
+
+    def get(self, event_id, session=None) -> EventSnapshot | None:
+        """session: baca miss lewat session caller (yang sudah memegang koneksi pool), bukan session baru."""
+        snap = self.peek(event_id)
+        if snap is not None: return snap
+
+        own = session is None
+        if own: session = self.session_factory()
+        try:
+            event = session.get(Event, event_id)
+            snap = EventSnapshot.from_model(event) if event else None
+        finally:
+            if own: session.close()
+        # Event yang tidak ada tidak di-cache, supaya event baru langsung terlihat
+        if snap is not None: self.put(snap)
+        return snap
+
+    def all(self) -> list[EventSnapshot]:
+        """Seluruh katalog urut tanggal, satu query saat miss."""
+        catalog = self.backend.get(CATALOG_KEY)
+        if catalog is not None:
+            self.hits += 1
+            return catalog
+
+        self.misses += 1
+        session = self.session_factory()
+        try:
+            catalog = [EventSnapshot.from_model(e) for e in session.scalars(select(Event).order_by(Event.date))]
+        finally: session.close()
+        self.backend.set(CATALOG_KEY, catalog, self.ttl)
+        return catalog
+
+    def invalidate(self, event_id=None):
+        """Buang satu event (plus katalog), atau semua kalau event_id None."""
+        if event_id is None: self.backend.clear()
+        else: self.backend.delete(self._key(event_id), CATALOG_KEY)
@@ -0,0 +1,73 @@
+"""Cek EXPLAIN untuk query panas booking/cancel/refund/my_bookings.
+
+Jalankan sebelum dan sesudah `alembic upgrade head` untuk membandingkan plan:
+
+    python explain_check.py [DB_URL]
+
+Exit code 1 kalau ada query panas yang masih full scan.
+"""
+import json
+import sys
+
+from sqlalchemy import create_engine, select, text
+
+import db_crud
+from models import Booking, Seat
+
+SAMPLE_ID = 1
+
+def hot_queries(dialect):
+    return {
+        "klaim kursi (booking)": db_crud.claim_seats_stmt(dialect, SAMPLE_ID, 4, SAMPLE_ID),
+        "kursi kosong per event": select(Seat.id).where(Seat.event_id == SAMPLE_ID, Seat.is_booked == False),
+        "lepas kursi (cancel/refund)": select(Seat.id).where(Seat.booking_id == SAMPLE_ID),
+        "booking saya": select(Booking.id).where(Booking.customer_id == SAMPLE_ID),
+        "booking per event & status": select(Booking.id).where(Booking.event_id == SAMPLE_ID, Booking.status == 'Pending'),
+    }
+
+def _pg_plan(conn, sql):
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str): plan = json.loads(plan)
+    nodes, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(f"{node['Node Type']} {node.get('Index Name', node.get('Relation Name', ''))}".strip())
+        stack.extend(node.get("Plans", []))
+    return nodes, not any(n.startswith("Seq Scan") for n in nodes)
+
+def _sqlite_plan(conn, sql):
+    nodes = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    full_scan = any(n.startswith("SCAN ") and "INDEX" not in n for n in nodes)
+    return nodes, not full_scan
+
+def check_hot_query_plans(engine) -> dict[str, tuple[list[str], bool]]:
+    """Return {nama_query: (node plan, pakai index?)}."""
+    results = {}
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            # Tabel kecil/kosong bikin planner pilih Seq Scan walau index ada;
+            # yang dicek di sini apakah index *bisa* dipakai.
+            conn.execute(text("SET enable_seqscan = off"))
+            explain = _pg_plan
+        elif engine.dialect.name == 'sqlite':
+            explain = _sqlite_plan
+        else:
+            raise ValueError(f"Dialek {engine.dialect.name} belum didukung")
+
+        for name, stmt in hot_queries(engine.dialect).items():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            results[name] = explain(conn, sql)
+        conn.rollback()
+    return results
+
+def main():
+    engine = create_engine(sys.argv[1] if len(sys.argv) > 1 else db_crud.DB_URL)
+    ok = True
+    for name, (nodes, uses_index) in check_hot_query_plans(engine).items():
+        ok &= uses_index
+        print(f"{'✅' if uses_index else '❌'} {name}")
+        for n in nodes: print(f"     {n}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
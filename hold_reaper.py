@@ -0,0 +1,56 @@
+"""Reaper background untuk hold booking Pending yang sudah kedaluwarsa.
+
+Tiap putaran memanggil db_crud.release_expired_holds() berulang (satu
+transaksi pendek per batch) sampai antrian habis, lalu tidur `interval` detik.
+
+    python hold_reaper.py [--interval 5] [--batch 500]
+"""
+import argparse
+import threading
+
+import db_crud
+
+REAP_INTERVAL = 5  # detik
+
+class HoldReaper(threading.Thread):
+    def __init__(self, interval=REAP_INTERVAL, batch_size=db_crud.REAP_BATCH, on_error=print):
+        super().__init__(name="hold-reaper", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.stopped = threading.Event()
+        self.total = 0
+
+    def reap_once(self) -> int:
+        n = 0
+        while not self.stopped.is_set():
+            released = db_crud.release_expired_holds(self.batch_size)
+            n += released
+            if released < self.batch_size: break
+        self.total += n
+        return n
+
+    def run(self):
+        while not self.stopped.is_set():
+            try: self.reap_once()
+            except Exception as e: self.on_error(f"❌ Reaper gagal: {e}")
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+
+def main():
+    ap = argparse.ArgumentParser(description="Reaper hold booking Pending")
+    ap.add_argument("--interval", type=float, default=REAP_INTERVAL)
+    ap.add_argument("--batch", type=int, default=db_crud.REAP_BATCH)
+    args = ap.parse_args()
+    reaper = HoldReaper(args.interval, args.batch)
+    reaper.start()
+    try:
+        while reaper.is_alive(): reaper.join(1)
+    except KeyboardInterrupt:
+        reaper.stop()
+    print(f"✅ Reaper berhenti, {reaper.total} booking di-expire.")
+
+if __name__ == "__main__":
+    main()
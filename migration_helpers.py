@@ -0,0 +1,154 @@
+"""Helper migrasi Alembic yang aman dijalankan saat penjualan berjalan.
+
+Di PostgreSQL, DDL biasa mengambil ACCESS EXCLUSIVE lock; kalau harus antre di
+belakang transaksi booking yang panjang, semua query ke tabel itu ikut antre di
+belakangnya. Maka:
+
+    set_timeouts()           lock_timeout pendek (gagal cepat, bukan memblokir
+                             penjualan) + statement_timeout; dipanggil env.py
+    with_lock_retry(fn)      ulangi DDL yang kena lock_timeout (savepoint + jeda)
+    add_column_if_missing()  ADD COLUMN yang dilewati kalau kolom sudah ada
+    create_index_online()    CREATE INDEX CONCURRENTLY di luar transaksi migrasi;
+                             index INVALID sisa percobaan gagal dibuang dulu
+    drop_index_online()      DROP INDEX CONCURRENTLY
+    backfill()               UPDATE per rentang id, tiap chunk commit sendiri,
+                             ada jeda antar chunk dan laporan progres. Bisa
+                             dilanjutkan: hanya baris yang masih `pending`
+                             yang disentuh, mulai dari id terkecil yang tersisa
+
+Pola kolom baru di tabel besar:
+
+    add_column_if_missing('seats', sa.Column('zone', sa.String(10), nullable=True))  # instan
+    backfill('seats', {'zone': sa.text("'REG'")}, pending=sa.text("zone IS NULL"))
+    create_index_online('ix_seats_zone', 'seats', ['zone'])
+
+backfill() dan create_index_online() meng-commit transaksi migrasi di tengah revisi
+(autocommit_block), sebelum alembic_version maju. Kalau revisi terputus lalu
+dijalankan ulang, DDL sebelumnya sudah ada: semua langkah di revisi seperti ini
+harus idempoten, jadi jangan pakai op.add_column biasa di revisi yang sama.
+
+Dialek lain (SQLite untuk dev/test) memakai jalur biasa dengan perilaku yang sama.
+"""
+import os
+import time
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.exc import OperationalError
+
+LOCK_TIMEOUT = os.environ.get("MIGRATION_LOCK_TIMEOUT", "5s")
+STATEMENT_TIMEOUT = os.environ.get("MIGRATION_STATEMENT_TIMEOUT", "15min")
+LOCK_RETRIES = 5
+LOCK_RETRY_DELAY = 2.0   # detik, dikali nomor percobaan
+BACKFILL_BATCH = 5000    # rentang id per chunk
+BACKFILL_PAUSE = 0.1     # detik jeda antar chunk (beri ruang transaksi booking)
+
+def _ms(value) -> int:
+    """'5s' / '15min' / '500ms' / 5000 -> milidetik (busy_timeout SQLite)."""
+    if isinstance(value, (int, float)): return int(value)
+    units = {"ms": 1, "s": 1000, "min": 60_000, "h": 3_600_000}
+    for unit in ("ms", "min", "s", "h"):
+        if value.endswith(unit): return int(float(value[:-len(unit)]) * units[unit])
+    return int(value)
+
+def set_timeouts(connection=None, lock_timeout=LOCK_TIMEOUT, statement_timeout=STATEMENT_TIMEOUT):
+    """Batas tunggu lock & durasi statement untuk koneksi migrasi (level sesi)."""
+    conn = connection if connection is not None else op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql(f"SET lock_timeout = '{lock_timeout}'")
+        conn.exec_driver_sql(f"SET statement_timeout = '{statement_timeout}'")
+    elif conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql(f"PRAGMA busy_timeout = {_ms(lock_timeout)}")
+
+def _lock_timeout(exc) -> bool:
+    code = getattr(exc.orig, "pgcode", None)
+    return code == '55P03' or "database is locked" in str(exc.orig)
+
+def with_lock_retry(fn, retries=LOCK_RETRIES, delay=LOCK_RETRY_DELAY):
+    """Jalankan fn() (DDL) dalam savepoint; kalau gagal karena lock_timeout, tunggu lalu ulangi."""
+    if context.is_offline_mode(): return fn()
+    conn = op.get_bind()
+    for attempt in range(1, retries + 1):
+        savepoint = conn.begin_nested()
+        try:
+            result = fn()
+            savepoint.commit()
+            return result
+        except OperationalError as e:
+            savepoint.rollback()
+            if not _lock_timeout(e) or attempt == retries: raise
+            print(f"⏳ Lock sibuk, coba lagi ({attempt}/{retries})...")
+            time.sleep(delay * attempt)
+
+def add_column_if_missing(table, column) -> bool:
+    """op.add_column yang idempoten (lihat docstring modul); return False kalau kolom sudah ada.
+
+    Offline (--sql) skema tidak bisa dibaca, jadi ADD COLUMN selalu ditulis.
+    """
+    if not context.is_offline_mode():
+        if any(c['name'] == column.name for c in sa.inspect(op.get_bind()).get_columns(table)): return False
+    with_lock_retry(lambda: op.add_column(table, column))
+    return True
+
+def _invalid_index(conn, name) -> bool:
+    return bool(conn.scalar(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"), {"name": name}))
+
+def create_index_online(name, table, columns, **kw):
+    """CREATE INDEX CONCURRENTLY (PostgreSQL) tanpa memblokir tulis; idempoten.
+
+    Berjalan di autocommit_block: transaksi migrasi di-commit dulu, jadi pakai
+    transaction_per_migration (env.py) supaya yang ikut ter-commit hanya revisi ini.
+    """
+    if op.get_bind().dialect.name != 'postgresql' or context.is_offline_mode():
+        return op.create_index(name, table, columns, if_not_exists=True, **kw)
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        # Build CONCURRENTLY yang gagal meninggalkan index INVALID: buang lalu bangun ulang
+        if _invalid_index(conn, name): op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        conn.exec_driver_sql("SET statement_timeout = 0")  # build di tabel besar boleh lama
+        try:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+        finally:
+            conn.exec_driver_sql(f"SET statement_timeout = '{STATEMENT_TIMEOUT}'")
+
+def drop_index_online(name, table):
+    if op.get_bind().dialect.name != 'postgresql' or context.is_offline_mode():
+        return op.drop_index(name, table_name=table, if_exists=True)
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+def backfill(table, values, pending, key='id', batch_size=BACKFILL_BATCH, pause=BACKFILL_PAUSE, progress=None) -> int:
+    """UPDATE table SET values WHERE pending, per rentang `key` [lo, lo + batch_size).
+
+    values: dict kolom -> nilai/ekspresi SQL. pending: kondisi baris yang BELUM
+    di-backfill (mis. text("position IS NULL")); wajib jadi false setelah di-update
+    supaya backfill yang terputus bisa dijalankan ulang dari sisa baris.
+    Tiap chunk commit sendiri (autocommit), lock baris hanya selama satu chunk.
+    progress(tabel, id_sekarang, id_max, baris_diupdate) dipanggil per chunk.
+    Return jumlah baris yang di-update.
+    """
+    tbl = sa.table(table, sa.column(key), *(sa.column(c) for c in values))
+    pk = tbl.c[key]
+    stmt = sa.update(tbl).values(values).where(pending)
+    if context.is_offline_mode():  # --sql: tidak bisa membaca rentang id, satu UPDATE saja
+        op.execute(stmt)
+        return 0
+
+    progress = progress or _print_progress
+    total = 0
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        lo, hi = conn.execute(sa.select(sa.func.min(pk), sa.func.max(pk)).where(pending)).one()
+        if lo is None: return 0
+        while lo <= hi:
+            total += conn.execute(stmt.where(pk >= lo, pk < lo + batch_size)).rowcount
+            lo += batch_size
+            progress(table, min(lo, hi + 1) - 1, hi, total)
+            if pause and lo <= hi: time.sleep(pause)
+    return total
+
+def _print_progress(table, current, last, done):
+    print(f"⏳ Backfill {table}: id {current}/{last} | {done} baris diupdate")
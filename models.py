@@ -1,6 +1,8 @@
-from sqlalchemy import Column, DateTime, String, Integer, Text, Numeric, ForeignKey, func, CheckConstraint, Boolean
+from sqlalchemy import Column, DateTime, String, Integer, Text, Numeric, ForeignKey, func, CheckConstraint, Boolean, Index, text, BigInteger
+from sqlalchemy import DDL, event, literal
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime
 
 Base = declarative_base()
 metadata = Base.metadata
@@ -28,6 +30,15 @@ class User(Base):
 class Event(Base):
     """Tabel Events"""
     __tablename__ = 'events'
+    __table_args__ = (
+        # Filter rentang tanggal + keyset (date, id) di search_events
+        Index('ix_events_date_id', 'date', 'id'),
+        # Potongan nama/venue (ILIKE '%..%') di PostgreSQL lewat trigram
+        Index('ix_events_name_trgm', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_events_venue_trgm', 'venue', postgresql_using='gin',
+              postgresql_ops={'venue': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     id = Column(Integer, primary_key=True)
     admin_id = Column(Integer, ForeignKey('users.id'), nullable=False) 
@@ -39,16 +50,64 @@ class Event(Base):
     ticket_price = Column(Numeric(10, 2), nullable=False)
     total_capacity = Column(Integer, nullable=False) 
 
+    # Counter ketersediaan (denormalisasi dari tabel seats), diupdate di transaksi yang sama
+    seats_total = Column(Integer, nullable=False, default=0, server_default='0')
+    seats_booked = Column(Integer, nullable=False, default=0, server_default='0')
+    # 'Active' / 'Cancelled' (event dibatalkan: booking baru ditolak, semua booking direfund)
+    status = Column(String(20), nullable=False, default='Active', server_default='Active')
+    # Diisi archive.py: kursi/booking/payment event ini sudah dipindah ke tabel *_archive
+    archived_at = Column(DateTime, nullable=True)
+
     admin = relationship("User", back_populates="admin_events")
     bookings = relationship("Booking", back_populates="event")
     seats = relationship("Seat", back_populates="event", cascade="all, delete-orphan")
 
+    @property
+    def seats_available(self):
+        return self.seats_total - self.seats_booked
+
     def __repr__(self):
         return f"<Event {self.name}>"
 
+def event_search_document(c=Event.__table__.c):
+    """tsvector nama + venue + deskripsi (PostgreSQL). Query harus memakai ekspresi yang sama persis dengan index."""
+    # literal_execute: konstanta ditulis langsung di SQL, bukan parameter, supaya cocok dengan ekspresi index
+    lit = lambda v: literal(v, literal_execute=True)
+    doc = c.name.concat(lit(' ')).concat(c.venue).concat(lit(' ')).concat(func.coalesce(c.description, lit('')))
+    return func.to_tsvector(lit('simple'), doc)
+
+Index('ix_events_search_tsv', event_search_document(), postgresql_using='gin').ddl_if(dialect='postgresql')
+event.listen(Event.__table__, 'before_create', DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql'))
+
+# SQLite: index FTS5 external-content atas events, dijaga trigger. Trigger update hanya
+# untuk kolom teks, jadi bump counter kursi di jalur booking tidak menyentuh FTS.
+EVENTS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(name, venue, description, "
+    "content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts(rowid, name, venue, description) VALUES (new.id, new.name, new.venue, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, name, venue, description) "
+    "VALUES ('delete', old.id, old.name, old.venue, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF name, venue, description ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, name, venue, description) "
+    "VALUES ('delete', old.id, old.name, old.venue, old.description); "
+    "INSERT INTO events_fts(rowid, name, venue, description) VALUES (new.id, new.name, new.venue, new.description); END",
+]
+for _sql in EVENTS_FTS_DDL:
+    event.listen(Event.__table__, 'after_create', DDL(_sql).execute_if(dialect='sqlite'))
+event.listen(Event.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS events_fts").execute_if(dialect='sqlite'))
+
 class Booking(Base):
     """Tabel Bookings"""
     __tablename__ = 'bookings'
+    __table_args__ = (
+        Index('ix_bookings_customer_id', 'customer_id'),
+        Index('ix_bookings_event_id_status', 'event_id', 'status'),
+        # Antrian reaper: hanya booking Pending yang punya batas hold
+        Index('ix_bookings_pending_hold', 'hold_expires_at',
+              postgresql_where=text("status = 'Pending'"), sqlite_where=text("status = 'Pending'")),
+    )
     
     id = Column(Integer, primary_key=True)
     event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
@@ -59,6 +118,8 @@ class Booking(Base):
     booking_code = Column(String(50), unique=True, nullable=False)
     booking_date = Column(DateTime, default=func.now())
     status = Column(String(20), default='Pending', nullable=False) 
+    # Batas waktu hold kursi untuk booking Pending (NULL = tidak kedaluwarsa)
+    hold_expires_at = Column(DateTime, nullable=True)
 
     event = relationship("Event", back_populates="bookings")
     customer = relationship("User", back_populates="bookings")
@@ -71,6 +132,15 @@ class Booking(Base):
 class Seat(Base):
     """Tabel Seats (Kursi)"""
     __tablename__ = 'seats'
+    __table_args__ = (
+        Index('ix_seats_event_id_is_booked', 'event_id', 'is_booked'),
+        Index('ix_seats_booking_id', 'booking_id'),
+        # Partial index kursi kosong, dipakai klaim kursi (claim_seats_stmt)
+        Index('ix_seats_free', 'event_id', 'id',
+              postgresql_where=text('NOT is_booked'), sqlite_where=text('NOT is_booked')),
+        # Klaim blok kursi berdampingan: satu range scan per (event, baris)
+        Index('ix_seats_event_row_position', 'event_id', 'row_label', 'position'),
+    )
 
     id = Column(Integer, primary_key=True)
     event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
@@ -78,6 +148,9 @@ class Seat(Base):
     
     seat_label = Column(String(10), nullable=False) # Contoh: A1, B2
     is_booked = Column(Boolean, default=False)
+    # Baris & nomor urut dalam baris (VIP01-007 -> 'VIP01', 7; S012 -> 'S', 12), untuk kursi berdampingan
+    row_label = Column(String(10), nullable=True)
+    position = Column(Integer, nullable=True)
 
     event = relationship("Event", back_populates="seats")
     booking = relationship("Booking", back_populates="seats")
@@ -88,6 +161,7 @@ class Seat(Base):
 class Payment(Base):
     """Tabel Payments"""
     __tablename__ = 'payments'
+    __table_args__ = (Index('ix_payments_payment_date', 'payment_date'),)
 
     id = Column(Integer, primary_key=True)
     booking_id = Column(Integer, ForeignKey('bookings.id'), unique=True, nullable=False)
@@ -96,4 +170,100 @@ class Payment(Base):
     payment_date = Column(DateTime, default=func.now())
     status = Column(String(20), default='Success', nullable=False)
 
-    booking = relationship("Booking", back_populates="payment")
\ No newline at end of file
+    booking = relationship("Booking", back_populates="payment")
+
+class IdBlock(Base):
+    """Tabel counter blok id (generator kode booking mengambil id per blok)"""
+    __tablename__ = 'id_blocks'
+
+    name = Column(String(50), primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<IdBlock {self.name}={self.next_value}>"
+
+class OutboxEvent(Base):
+    """Tabel Outbox: catatan perubahan kursi/booking, ditulis di transaksi yang sama"""
+    __tablename__ = 'outbox'
+    # AUTOINCREMENT di SQLite: id tidak dipakai ulang setelah prune(), kursor konsumen tidak melewatinya
+    __table_args__ = (Index('ix_outbox_event_id_id', 'event_id', 'id'), {'sqlite_autoincrement': True})
+
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True)
+    event_id = Column(Integer, nullable=False)
+    # booked / cancelled / expired / paid / refunded / event_cancelled
+    kind = Column(String(30), nullable=False)
+    booking_code = Column(String(50), nullable=True)
+    payload = Column(Text, nullable=False)  # JSON ringkas, mis. {"seats": [...], "qty": 2}
+    # Jam aplikasi (bukan DB) supaya bisa dibandingkan konsumen saat menilai celah id
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.id} {self.kind}>"
+
+class OutboxCursor(Base):
+    """Posisi baca terakhir tiap konsumen outbox"""
+    __tablename__ = 'outbox_cursors'
+
+    consumer = Column(String(100), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<OutboxCursor {self.consumer}={self.last_id}>"
+
+# ===============================================
+# ARSIP (event selesai, dipindah oleh archive.py)
+# Kolom sama dengan tabel aslinya, id dipertahankan; tanpa FK ke tabel panas
+# supaya pemindahan per batch tidak bergantung urutan.
+# ===============================================
+class BookingArchive(Base):
+    """Tabel Bookings (arsip)"""
+    __tablename__ = 'bookings_archive'
+    __table_args__ = (
+        Index('ix_bookings_archive_event_id', 'event_id'),
+        Index('ix_bookings_archive_customer_id', 'customer_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    event_id = Column(Integer, nullable=False)
+    customer_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    total_price = Column(Numeric(10, 2), nullable=False)
+    booking_code = Column(String(50), unique=True, nullable=False)
+    booking_date = Column(DateTime)
+    status = Column(String(20), nullable=False)
+    hold_expires_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<BookingArchive {self.booking_code}>"
+
+class SeatArchive(Base):
+    """Tabel Seats (arsip)"""
+    __tablename__ = 'seats_archive'
+    __table_args__ = (
+        Index('ix_seats_archive_event_id', 'event_id'),
+        Index('ix_seats_archive_booking_id', 'booking_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    event_id = Column(Integer, nullable=False)
+    booking_id = Column(Integer, nullable=True)
+    seat_label = Column(String(10), nullable=False)
+    is_booked = Column(Boolean, default=False)
+    row_label = Column(String(10), nullable=True)
+    position = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<SeatArchive {self.seat_label}>"
+
+class PaymentArchive(Base):
+    """Tabel Payments (arsip)"""
+    __tablename__ = 'payments_archive'
+    __table_args__ = (Index('ix_payments_archive_payment_date', 'payment_date'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    booking_id = Column(Integer, unique=True, nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    payment_method = Column(String(50), nullable=False)
+    payment_date = Column(DateTime)
+    status = Column(String(20), nullable=False)
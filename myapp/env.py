@@ -1,9 +1,11 @@
+import os
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from migration_helpers import set_timeouts
 from models import Base
 
 # this is the Alembic Config object, which provides
@@ -15,6 +17,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# URL primary dari env var yang sama dengan aplikasi (db_engine.py) menimpa alembic.ini
+if os.environ.get("TICKET_DB_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["TICKET_DB_URL"].replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -65,8 +71,15 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # Lock pendek: DDL yang antre di belakang transaksi booking gagal cepat
+        # (lihat migration_helpers.py), bukan membuat antrian di belakangnya
+        set_timeouts(connection)
+        connection.commit()
+        # Satu transaksi per revisi: lock dilepas tiap revisi selesai, dan
+        # autocommit_block (index CONCURRENTLY, backfill) hanya meng-commit revisinya sendiri
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
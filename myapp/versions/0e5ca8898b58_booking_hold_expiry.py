@@ -0,0 +1,37 @@
+"""Booking hold expiry
+
+Revision ID: 0e5ca8898b58
+Revises: 888081886593
+Create Date: 2026-10-17 12:41:07.553918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0e5ca8898b58'
+down_revision: Union[str, Sequence[str], None] = '888081886593'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable tanpa default: tidak menulis ulang tabel; booking lama tetap tanpa batas hold
+    op.add_column('bookings', sa.Column('hold_expires_at', sa.DateTime(), nullable=True))
+    pending = sa.text("status = 'Pending'")
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_bookings_pending_hold', 'bookings', ['hold_expires_at'],
+                            postgresql_where=pending, postgresql_concurrently=True)
+    else:
+        op.create_index('ix_bookings_pending_hold', 'bookings', ['hold_expires_at'], sqlite_where=pending)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_pending_hold', table_name='bookings')
+    op.drop_column('bookings', 'hold_expires_at')
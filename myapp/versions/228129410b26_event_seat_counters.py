@@ -0,0 +1,36 @@
+"""Event seat counters
+
+Revision ID: 228129410b26
+Revises: 9498b6428573
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '228129410b26'
+down_revision: Union[str, Sequence[str], None] = '9498b6428573'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('seats_total', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('events', sa.Column('seats_booked', sa.Integer(), server_default='0', nullable=False))
+    # Isi counter dari data kursi yang sudah ada
+    op.execute(
+        "UPDATE events SET "
+        "seats_total = (SELECT COUNT(*) FROM seats WHERE seats.event_id = events.id), "
+        "seats_booked = (SELECT COUNT(*) FROM seats WHERE seats.event_id = events.id AND seats.is_booked)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'seats_booked')
+    op.drop_column('events', 'seats_total')
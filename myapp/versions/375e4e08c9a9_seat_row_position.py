@@ -0,0 +1,60 @@
+"""Seat row and position
+
+Revision ID: 375e4e08c9a9
+Revises: f19307cff0ce
+Create Date: 2026-10-17 15:20:44.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import add_column_if_missing, backfill, create_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = '375e4e08c9a9'
+down_revision: Union[str, Sequence[str], None] = 'f19307cff0ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Backfill dari label: layout 'VIP01-007' -> ('VIP01', 7), generate_seats 'S012' -> ('S', 12).
+# Label lain (input manual) dibiarkan NULL: tidak ikut pencarian kursi berdampingan.
+# (values, pending) per dialek; pending jadi false setelah position terisi, jadi backfill bisa dilanjutkan.
+BACKFILL = {
+    'postgresql': [
+        ({'row_label': sa.text("split_part(seat_label, '-', 1)"), 'position': sa.text("split_part(seat_label, '-', 2)::int")},
+         sa.text("position IS NULL AND seat_label ~ '^[A-Z0-9]+-[0-9]+$'")),
+        ({'row_label': sa.text("'S'"), 'position': sa.text("substr(seat_label, 2)::int")},
+         sa.text("position IS NULL AND seat_label ~ '^S[0-9]+$'")),
+    ],
+    'sqlite': [
+        ({'row_label': sa.text("substr(seat_label, 1, instr(seat_label, '-') - 1)"),
+          'position': sa.text("CAST(substr(seat_label, instr(seat_label, '-') + 1) AS INTEGER)")},
+         sa.text("position IS NULL AND seat_label GLOB '[A-Z0-9]*-[0-9]*' "
+                 "AND substr(seat_label, instr(seat_label, '-') + 1) NOT GLOB '*[^0-9]*'")),
+        ({'row_label': sa.text("'S'"), 'position': sa.text("CAST(substr(seat_label, 2) AS INTEGER)")},
+         sa.text("position IS NULL AND seat_label GLOB 'S[0-9]*' AND substr(seat_label, 2) NOT GLOB '*[^0-9]*'")),
+    ],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Idempoten: backfill meng-commit di tengah revisi, jadi kolom sudah ada kalau revisi ini diulang
+    add_column_if_missing('seats', sa.Column('row_label', sa.String(length=10), nullable=True))
+    add_column_if_missing('seats', sa.Column('position', sa.Integer(), nullable=True))
+    dialect = op.get_bind().dialect.name
+    # Per rentang id, tiap chunk commit sendiri: seats tidak terkunci lama saat penjualan berjalan
+    for values, pending in BACKFILL.get(dialect, []):
+        backfill('seats', values, pending)
+
+    create_index_online('ix_seats_event_row_position', 'seats', ['event_id', 'row_label', 'position'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_seats_event_row_position', table_name='seats')
+    op.drop_column('seats', 'position')
+    op.drop_column('seats', 'row_label')
@@ -0,0 +1,50 @@
+"""Hot path indexes
+
+Revision ID: 70157596779a
+Revises: 228129410b26
+Create Date: 2026-10-17 10:03:55.620417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '70157596779a'
+down_revision: Union[str, Sequence[str], None] = '228129410b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_seats_event_id_is_booked', 'seats', ['event_id', 'is_booked'], {}),
+    ('ix_seats_booking_id', 'seats', ['booking_id'], {}),
+    ('ix_seats_free', 'seats', ['event_id', 'id'],
+     {'postgresql_where': sa.text('NOT is_booked'), 'sqlite_where': sa.text('NOT is_booked')}),
+    ('ix_bookings_customer_id', 'bookings', ['customer_id'], {}),
+    ('ix_bookings_event_id_status', 'bookings', ['event_id', 'status'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY tidak boleh di dalam transaksi
+        with op.get_context().autocommit_block():
+            for name, table, cols, kw in INDEXES:
+                op.create_index(name, table, cols, postgresql_concurrently=True, **kw)
+    else:
+        for name, table, cols, kw in INDEXES:
+            op.create_index(name, table, cols, **kw)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
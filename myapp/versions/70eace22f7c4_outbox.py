@@ -0,0 +1,46 @@
+"""Outbox change feed for seats and bookings
+
+Revision ID: 70eace22f7c4
+Revises: 7d075b8c6f4b
+Create Date: 2026-10-17 17:20:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '70eace22f7c4'
+down_revision: Union[str, Sequence[str], None] = '7d075b8c6f4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('booking_code', sa.String(length=50), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_outbox_event_id_id', 'outbox', ['event_id', 'id'])
+    op.create_table('outbox_cursors',
+    sa.Column('consumer', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('consumer')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outbox_cursors')
+    op.drop_index('ix_outbox_event_id_id', table_name='outbox')
+    op.drop_table('outbox')
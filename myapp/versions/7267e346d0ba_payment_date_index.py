@@ -0,0 +1,36 @@
+"""Payment date index
+
+Revision ID: 7267e346d0ba
+Revises: 70157596779a
+Create Date: 2026-10-17 11:20:31.407552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7267e346d0ba'
+down_revision: Union[str, Sequence[str], None] = '70157596779a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rentang tanggal laporan keuangan (reports.revenue_report_stmt)
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_payments_payment_date', 'payments', ['payment_date'], postgresql_concurrently=True)
+    else:
+        op.create_index('ix_payments_payment_date', 'payments', ['payment_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_payments_payment_date', table_name='payments', postgresql_concurrently=True)
+    else:
+        op.drop_index('ix_payments_payment_date', table_name='payments')
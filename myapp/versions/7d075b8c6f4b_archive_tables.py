@@ -0,0 +1,78 @@
+"""Archive tables for finished events
+
+Revision ID: 7d075b8c6f4b
+Revises: 375e4e08c9a9
+Create Date: 2026-10-17 16:05:12.663481
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d075b8c6f4b'
+down_revision: Union[str, Sequence[str], None] = '375e4e08c9a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+    # Tabel baru & kosong: index dibuat biasa, tidak perlu CONCURRENTLY
+    op.create_table('bookings_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('booking_code', sa.String(length=50), nullable=False),
+    sa.Column('booking_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('hold_expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('booking_code')
+    )
+    op.create_index('ix_bookings_archive_event_id', 'bookings_archive', ['event_id'])
+    op.create_index('ix_bookings_archive_customer_id', 'bookings_archive', ['customer_id'])
+
+    op.create_table('seats_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=True),
+    sa.Column('seat_label', sa.String(length=10), nullable=False),
+    sa.Column('is_booked', sa.Boolean(), nullable=True),
+    sa.Column('row_label', sa.String(length=10), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_seats_archive_event_id', 'seats_archive', ['event_id'])
+    op.create_index('ix_seats_archive_booking_id', 'seats_archive', ['booking_id'])
+
+    op.create_table('payments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('payment_method', sa.String(length=50), nullable=False),
+    sa.Column('payment_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('booking_id')
+    )
+    op.create_index('ix_payments_archive_payment_date', 'payments_archive', ['payment_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_archive_payment_date', table_name='payments_archive')
+    op.drop_table('payments_archive')
+    op.drop_index('ix_seats_archive_booking_id', table_name='seats_archive')
+    op.drop_index('ix_seats_archive_event_id', table_name='seats_archive')
+    op.drop_table('seats_archive')
+    op.drop_index('ix_bookings_archive_customer_id', table_name='bookings_archive')
+    op.drop_index('ix_bookings_archive_event_id', table_name='bookings_archive')
+    op.drop_table('bookings_archive')
+    op.drop_column('events', 'archived_at')
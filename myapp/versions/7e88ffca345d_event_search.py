@@ -0,0 +1,70 @@
+"""Event search indexes
+
+Revision ID: 7e88ffca345d
+Revises: 70eace22f7c4
+Create Date: 2026-10-17 18:02:37.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e88ffca345d'
+down_revision: Union[str, Sequence[str], None] = '70eace22f7c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Harus sama persis dengan models.event_search_document() supaya query memakai index
+SEARCH_DOCUMENT = "to_tsvector('simple', name || ' ' || venue || ' ' || coalesce(description, ''))"
+
+# Salinan models.EVENTS_FTS_DDL saat revisi ini dibuat
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(name, venue, description, "
+    "content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts(rowid, name, venue, description) VALUES (new.id, new.name, new.venue, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, name, venue, description) "
+    "VALUES ('delete', old.id, old.name, old.venue, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF name, venue, description ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, name, venue, description) "
+    "VALUES ('delete', old.id, old.name, old.venue, old.description); "
+    "INSERT INTO events_fts(rowid, name, venue, description) VALUES (new.id, new.name, new.venue, new.description); END",
+    # Isi index dari baris events yang sudah ada
+    "INSERT INTO events_fts(events_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    create_index_online('ix_events_date_id', 'events', ['date', 'id'])
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        create_index_online('ix_events_name_trgm', 'events', ['name'],
+                            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+        create_index_online('ix_events_venue_trgm', 'events', ['venue'],
+                            postgresql_using='gin', postgresql_ops={'venue': 'gin_trgm_ops'})
+        create_index_online('ix_events_search_tsv', 'events', [sa.text(SEARCH_DOCUMENT)], postgresql_using='gin')
+    elif dialect == 'sqlite':
+        for sql in SQLITE_FTS:
+            op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        drop_index_online('ix_events_search_tsv', 'events')
+        drop_index_online('ix_events_venue_trgm', 'events')
+        drop_index_online('ix_events_name_trgm', 'events')
+    elif dialect == 'sqlite':
+        for name in ('events_fts_au', 'events_fts_ad', 'events_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS events_fts")
+    drop_index_online('ix_events_date_id', 'events')
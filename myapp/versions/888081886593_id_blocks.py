@@ -0,0 +1,33 @@
+"""Id blocks for booking codes
+
+Revision ID: 888081886593
+Revises: 7267e346d0ba
+Create Date: 2026-10-17 11:58:12.902164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '888081886593'
+down_revision: Union[str, Sequence[str], None] = '7267e346d0ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    id_blocks = op.create_table('id_blocks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(id_blocks, [{'name': 'booking_code', 'next_value': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('id_blocks')
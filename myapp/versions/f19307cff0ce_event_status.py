@@ -0,0 +1,29 @@
+"""Event status
+
+Revision ID: f19307cff0ce
+Revises: 0e5ca8898b58
+Create Date: 2026-10-17 14:02:31.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19307cff0ce'
+down_revision: Union[str, Sequence[str], None] = '0e5ca8898b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Default konstan: di PostgreSQL 11+ cukup ubah katalog, tabel tidak ditulis ulang
+    op.add_column('events', sa.Column('status', sa.String(length=20), nullable=False, server_default='Active'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'status')
@@ -0,0 +1,177 @@
+"""Change feed dari tabel outbox: perubahan kursi/booking secara inkremental.
+
+Jalur booking, cancel, expire (reaper), pembayaran, refund dan cancel event
+menulis satu catatan ringkas ke `outbox` di transaksi yang sama dengan
+perubahannya, jadi catatan ada kalau dan hanya kalau perubahannya commit.
+Konsumen (peta kursi, cache, analitik) cukup membaca delta setelah kursor
+tersimpan, per batch, lewat index primary key, tanpa memindai `seats`.
+
+    kind             booking_code  payload
+    booked           ya            {"seats": [...]}
+    cancelled        ya / None     {"seats": [...]}  (None = satu chunk cancel_event,
+                                   plus "bookings" & "refunded")
+    expired          ya            {"seats": [...]}
+    paid             ya            {"amount": ...}
+    refunded         ya            {"seats": [...], "amount": ...}
+    event_cancelled  None          {}
+
+Pengiriman at-least-once: kursor disimpan SETELAH handler selesai, jadi batch
+yang gagal diproses ulang. Handler sebaiknya idempoten.
+
+    consumer = OutboxConsumer("seat-map")
+    consumer.run(lambda batch: ..., interval=1)
+
+    python outbox.py --consumer analytics [--follow] [--batch 500]
+    python outbox.py --prune
+"""
+import argparse
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+import db_crud
+from models import OutboxEvent, OutboxCursor
+
+OUTBOX_BATCH = 500
+POLL_INTERVAL = 1.0   # detik antar poll saat feed kosong
+# Id dibagikan saat INSERT tapi transaksi bisa commit tidak berurutan (PostgreSQL):
+# celah id yang lebih muda dari ini ditunggu dulu, lebih tua dianggap rollback.
+GAP_TIMEOUT = timedelta(seconds=10)
+PRUNE_BATCH = 5000
+
+class ChangeRecord(NamedTuple):
+    id: int
+    event_id: int
+    kind: str
+    booking_code: str | None
+    data: dict
+    created_at: datetime
+
+    @classmethod
+    def from_row(cls, row) -> "ChangeRecord":
+        return cls(row.id, row.event_id, row.kind, row.booking_code, json.loads(row.payload), row.created_at)
+
+def read_changes(after_id=0, limit=OUTBOX_BATCH, event_id=None) -> list[ChangeRecord]:
+    """Catatan dengan id > after_id, urut id. event_id: hanya satu event (index event_id, id)."""
+    stmt = select(OutboxEvent).where(OutboxEvent.id > after_id).order_by(OutboxEvent.id).limit(limit)
+    if event_id is not None: stmt = stmt.where(OutboxEvent.event_id == event_id)
+    session = db_crud.ReadSession()
+    try:
+        return [ChangeRecord.from_row(r) for r in session.scalars(stmt)]
+    finally: session.close()
+
+def settled(records, after_id, now=None) -> list[ChangeRecord]:
+    """Potong batch di celah id pertama yang masih muda (transaksi sebelumnya mungkin belum commit)."""
+    cutoff = (now or datetime.now()) - GAP_TIMEOUT
+    prev = after_id
+    for i, rec in enumerate(records):
+        if rec.id != prev + 1 and rec.created_at > cutoff: return records[:i]
+        prev = rec.id
+    return records
+
+class OutboxConsumer:
+    def __init__(self, name, batch_size=OUTBOX_BATCH):
+        self.name = name
+        self.batch_size = batch_size
+        self._position = None
+        self.stopped = threading.Event()
+
+    def position(self) -> int:
+        """id terakhir yang sudah diproses (0 kalau konsumen baru)."""
+        if self._position is None:
+            session = db_crud.Session()
+            try:
+                self._position = session.scalar(select(OutboxCursor.last_id).where(OutboxCursor.consumer == self.name)) or 0
+            finally: session.close()
+        return self._position
+
+    def poll(self) -> list[ChangeRecord]:
+        """Batch berikutnya setelah kursor (kursor belum maju sampai commit())."""
+        after = self.position()
+        return settled(read_changes(after, self.batch_size), after)
+
+    def commit(self, last_id):
+        """Simpan kursor; tidak pernah mundur."""
+        session = db_crud.Session()
+        try:
+            moved = session.execute(
+                update(OutboxCursor).where(OutboxCursor.consumer == self.name, OutboxCursor.last_id < last_id)
+                .values(last_id=last_id, updated_at=datetime.now())).rowcount
+            if not moved and not session.get(OutboxCursor, self.name):
+                session.execute(insert(OutboxCursor).values(consumer=self.name, last_id=last_id, updated_at=datetime.now()))
+            session.commit()
+        except IntegrityError:
+            session.rollback()  # instance lain baru membuat kursor yang sama
+            self._position = None
+            return self.commit(last_id)
+        except Exception:
+            session.rollback(); raise
+        finally: session.close()
+        self._position = max(self._position or 0, last_id)
+
+    def process(self, handler) -> int:
+        """Satu batch: handler(list[ChangeRecord]) lalu kursor maju. Return jumlah catatan."""
+        batch = self.poll()
+        if not batch: return 0
+        handler(batch)
+        self.commit(batch[-1].id)
+        return len(batch)
+
+    def run(self, handler, interval=POLL_INTERVAL, on_error=print):
+        """Loop sampai stop(): habiskan feed per batch, lalu tidur `interval` detik."""
+        while not self.stopped.is_set():
+            try:
+                while self.process(handler) >= self.batch_size and not self.stopped.is_set(): pass
+            except Exception as e: on_error(f"❌ Konsumen outbox {self.name} gagal: {e}")
+            self.stopped.wait(interval)
+
+    def stop(self):
+        self.stopped.set()
+
+def prune(batch_size=PRUNE_BATCH) -> int:
+    """Hapus catatan yang sudah diproses SEMUA konsumen (id <= kursor terkecil), per batch."""
+    session = db_crud.Session()
+    try:
+        upto = session.scalar(select(func.min(OutboxCursor.last_id)))
+        if not upto: return 0
+        total = 0
+        while True:
+            ids = select(OutboxEvent.id).where(OutboxEvent.id <= upto).order_by(OutboxEvent.id).limit(batch_size)
+            n = session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(ids.scalar_subquery()))
+                                .execution_options(synchronize_session=False)).rowcount
+            session.commit()
+            total += n
+            if n < batch_size: return total
+    except Exception:
+        session.rollback(); raise
+    finally: session.close()
+
+def format_record(r: ChangeRecord) -> str:
+    return f"#{r.id} {r.created_at:%Y-%m-%d %H:%M:%S} | Event {r.event_id} | {r.kind} | {r.booking_code or '-'} | {r.data}"
+
+def main():
+    ap = argparse.ArgumentParser(description="Baca change feed outbox")
+    ap.add_argument("--consumer", default="cli", help="nama konsumen (kursor disimpan per nama)")
+    ap.add_argument("--batch", type=int, default=OUTBOX_BATCH)
+    ap.add_argument("--follow", action="store_true", help="terus polling sampai Ctrl+C")
+    ap.add_argument("--prune", action="store_true", help="hapus catatan yang sudah dibaca semua konsumen")
+    args = ap.parse_args()
+    if args.prune:
+        return print(f"✅ {prune()} catatan outbox dihapus.")
+
+    show = lambda batch: [print(format_record(r)) for r in batch]
+    consumer = OutboxConsumer(args.consumer, args.batch)
+    if args.follow:
+        try: consumer.run(show)
+        except KeyboardInterrupt: pass
+    else:
+        n = 0
+        while (got := consumer.process(show)): n += got
+        print(f"✅ {n} catatan baru untuk {args.consumer} (posisi {consumer.position()}).")
+
+if __name__ == "__main__":
+    main()
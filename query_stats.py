@@ -0,0 +1,160 @@
+"""Instrumentasi query per operasi db_crud (event engine SQLAlchemy).
+
+Fungsi yang didekorasi @tracked menjadi satu "operasi". Selama operasi jalan,
+setiap statement yang dieksekusi engine mana pun dicatat: jumlah statement,
+total & statement terlama, dan baris (rowcount cursor: SELECT + DML di psycopg2,
+hanya DML di SQLite). SQL identik yang diulang
+>= N_PLUS_ONE_THRESHOLD kali dalam satu operasi ditandai sebagai kemungkinan N+1.
+
+Aktifkan dengan install() atau env var TICKET_QUERY_STATS=1. Hasil per operasi
+ditulis sebagai log JSON (logger "ticket.queries"); agregat tersedia lewat
+prometheus_snapshot().
+"""
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+N_PLUS_ONE_THRESHOLD = 5
+
+log = logging.getLogger("ticket.queries")
+_current: ContextVar["OperationStats | None"] = ContextVar("ticket_query_op", default=None)
+_installed = False
+_lock = threading.Lock()
+_totals = {}  # nama operasi -> dict agregat
+
+class OperationStats:
+    __slots__ = ('name', 'started', 'statements', 'db_time', 'slowest', 'slowest_sql', 'rows', 'by_sql')
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = self.slowest = 0.0
+        self.slowest_sql = None
+        self.rows = 0
+        self.by_sql = Counter()
+
+    def record(self, sql, elapsed, rowcount):
+        self.statements += 1
+        self.db_time += elapsed
+        if elapsed > self.slowest: self.slowest, self.slowest_sql = elapsed, sql
+        if rowcount > 0: self.rows += rowcount
+        self.by_sql[sql] += 1
+
+    def repeated(self):
+        return [(sql, n) for sql, n in self.by_sql.most_common() if n >= N_PLUS_ONE_THRESHOLD]
+
+    def finish(self, failed=False):
+        repeated = self.repeated()
+        with _lock:
+            t = _totals.setdefault(self.name, dict.fromkeys(
+                ("calls", "errors", "statements", "db_time", "slowest", "rows", "n_plus_one"), 0))
+            t["calls"] += 1
+            t["errors"] += failed
+            t["statements"] += self.statements
+            t["db_time"] += self.db_time
+            t["slowest"] = max(t["slowest"], self.slowest)
+            t["rows"] += self.rows
+            t["n_plus_one"] += bool(repeated)
+
+        record = {"op": self.name, "statements": self.statements,
+                  "db_ms": round(self.db_time * 1000, 3), "slowest_ms": round(self.slowest * 1000, 3),
+                  "wall_ms": round((time.perf_counter() - self.started) * 1000, 3), "rows": self.rows,
+                  "failed": failed}
+        if repeated:
+            record["n_plus_one"] = [{"sql": sql[:200], "count": n} for sql, n in repeated]
+            log.warning(json.dumps(record))
+        else:
+            log.info(json.dumps(record))
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("ticket_query_start", []).append(time.perf_counter())
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("ticket_query_start")
+    if stats is None or not starts: return
+    stats.record(statement, time.perf_counter() - starts.pop(), getattr(cursor, "rowcount", -1))
+
+def install():
+    """Pasang listener di semua Engine (primary, replica, engine hasil use_database)."""
+    global _installed
+    if _installed: return
+    event.listen(Engine, "before_cursor_execute", _before)
+    event.listen(Engine, "after_cursor_execute", _after)
+    _installed = True
+
+def _instrumented_gen(stats, gen):
+    # Statement generator (stream_*) jalan saat iterasi, jadi context dipasang per next()
+    failed = True
+    try:
+        while True:
+            token = _current.set(stats)
+            try: item = next(gen)
+            except StopIteration:
+                failed = False
+                return
+            finally: _current.reset(token)
+            yield item
+    finally:
+        gen.close()
+        stats.finish(failed)
+
+def tracked(fn=None, *, name=None):
+    """Dekorator operasi. Panggilan bersarang dihitung ke operasi terluar."""
+    if fn is None: return functools.partial(tracked, name=name)
+    op_name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _installed or _current.get() is not None:
+            return fn(*args, **kwargs)
+        stats = OperationStats(op_name)
+        token = _current.set(stats)
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            stats.finish(failed=True)
+            raise
+        finally:
+            _current.reset(token)
+        if inspect.isgenerator(result): return _instrumented_gen(stats, result)
+        stats.finish()
+        return result
+    return wrapper
+
+def snapshot() -> dict[str, dict]:
+    with _lock:
+        return {name: dict(t) for name, t in _totals.items()}
+
+def reset():
+    with _lock: _totals.clear()
+
+def prometheus_snapshot() -> str:
+    """Agregat per operasi dalam format teks Prometheus."""
+    metrics = [
+        ("ticket_db_operation_calls_total", "counter", "calls", "Jumlah panggilan operasi"),
+        ("ticket_db_operation_errors_total", "counter", "errors", "Operasi yang gagal (exception)"),
+        ("ticket_db_statements_total", "counter", "statements", "Statement SQL yang dieksekusi"),
+        ("ticket_db_time_seconds_total", "counter", "db_time", "Total waktu eksekusi statement"),
+        ("ticket_db_slowest_statement_seconds", "gauge", "slowest", "Statement terlama yang pernah terlihat"),
+        ("ticket_db_rows_total", "counter", "rows", "Baris yang dikembalikan/diubah (rowcount)"),
+        ("ticket_db_n_plus_one_total", "counter", "n_plus_one", "Panggilan dengan SQL identik berulang (kemungkinan N+1)"),
+    ]
+    totals = snapshot()
+    lines = []
+    for metric, kind, key, help_ in metrics:
+        lines.append(f"# HELP {metric} {help_}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for op in sorted(totals):
+            lines.append(f'{metric}{{op="{op}"}} {totals[op][key]:g}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+"""Rekonsiliasi file settlement payment gateway (CSV/JSONL) terhadap payments.
+
+File di-stream sekali dan dipecah per crc32(booking_code) ke N file partisi
+sementara. Tiap partisi lalu di-hash-join: entri file dimuat ke dict, dicocokkan
+ke DB dengan lookup per batch (IN (...)), bukan satu query per baris. Memori
+dibatasi satu partisi, berapa pun besar file. Masalah ditulis ke CSV:
+
+    unknown     kode booking tidak ada di DB
+    unpaid      booking ada, payment belum tercatat
+    status      payment tercatat tapi bukan Success (mis. Refunded)
+    amount      nominal settlement != payments.amount
+    duplicate   kode muncul lebih dari sekali di file
+    invalid     baris tanpa kode / nominal tidak valid
+    missing     payment Success di DB (dalam --from/--to) tidak ada di file
+
+    python reconcile.py settlement.csv --out masalah.csv [--from 2026-10-01 --to 2026-10-02]
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+
+from sqlalchemy import select
+
+import db_crud
+from db_crud import chunked, date_range_filter
+from models import Booking, Payment
+
+PARTITIONS = 64
+LOOKUP_BATCH = 1000
+ISSUE_COLUMNS = ["kind", "booking_code", "file_amount", "db_amount", "line", "detail"]
+
+class ReconcileReport(NamedTuple):
+    lines: int
+    matched: int
+    unknown: int
+    unpaid: int
+    status: int
+    amount: int
+    duplicate: int
+    invalid: int
+    missing: int
+
+def iter_settlement(path, code_field="booking_code", amount_field="amount"):
+    """Stream (no_baris, kode, nominal_str) dari CSV atau JSONL (dilihat dari ekstensi)."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for n, line in enumerate(f, 1):
+                if not line.strip(): continue
+                try: rec = json.loads(line)
+                except ValueError: rec = {}
+                if not isinstance(rec, dict): rec = {}  # baris JSON valid tapi bukan objek ([1, 2], "x")
+                yield n, rec.get(code_field), rec.get(amount_field)
+        else:
+            for n, rec in enumerate(csv.DictReader(f), 2):  # baris 1 = header
+                yield n, rec.get(code_field), rec.get(amount_field)
+
+def _partition(code, partitions):
+    return zlib.crc32(code.encode('utf-8')) % partitions
+
+class Reconciler:
+    def __init__(self, issues_writer, partitions=PARTITIONS, batch_size=LOOKUP_BATCH):
+        self.out = issues_writer
+        self.partitions = partitions
+        self.batch_size = batch_size
+        self.counts = dict.fromkeys(ReconcileReport._fields, 0)
+
+    def issue(self, kind, code, file_amount=None, db_amount=None, line=None, detail=""):
+        self.counts[kind] += 1
+        self.out.writerow([kind, code, file_amount, db_amount, line, detail])
+
+    def _split(self, rows, tmpdir, prefix):
+        """Tulis rows (kode, ...) ke file partisi prefix-<i>.csv, return daftar path."""
+        paths = [os.path.join(tmpdir, f"{prefix}-{i}.csv") for i in range(self.partitions)]
+        files = [open(p, 'w', newline='', encoding='utf-8') for p in paths]
+        try:
+            writers = [csv.writer(f) for f in files]
+            for row in rows:
+                writers[_partition(row[0], self.partitions)].writerow(row)
+        finally:
+            for f in files: f.close()
+        return paths
+
+    def _file_rows(self, entries):
+        for n, code, amount in entries:
+            self.counts["lines"] += 1
+            code = "" if code is None else str(code).strip()  # JSONL bisa berisi angka
+            try: amount = Decimal(str(amount).strip())
+            except (InvalidOperation, ValueError): amount = None
+            if not code or amount is None or not amount.is_finite():
+                self.issue("invalid", code, None, None, n, "kode/nominal kosong atau tidak valid")
+                continue
+            yield code, str(amount), n
+
+    def _db_rows(self, conn, date_from, date_to):
+        # Sisi DB untuk deteksi 'missing': payment Success dalam rentang, di-stream
+        stmt = (select(Booking.booking_code, Payment.amount)
+                .join(Booking, Payment.booking_id == Booking.id)
+                .where(Payment.status == 'Success', *date_range_filter(Payment.payment_date, date_from, date_to)))
+        for code, amount in conn.execution_options(yield_per=self.batch_size * 10).execute(stmt):
+            yield code, str(amount)
+
+    def _lookup(self, conn, codes):
+        """booking_code -> (amount, status) atau None kalau belum dibayar; kode yang tidak ada tidak muncul."""
+        found = {}
+        for batch in chunked(codes, self.batch_size):
+            for code, amount, status in conn.execute(
+                    select(Booking.booking_code, Payment.amount, Payment.status)
+                    .outerjoin(Payment, Payment.booking_id == Booking.id)
+                    .where(Booking.booking_code.in_(batch))):
+                found[code] = (amount, status) if status is not None else None
+        return found
+
+    def _join_partition(self, conn, file_path, db_path):
+        entries = {}  # kode -> (nominal, no_baris) entri pertama
+        with open(file_path, newline='', encoding='utf-8') as f:
+            for code, amount, n in csv.reader(f):
+                if code in entries:
+                    self.issue("duplicate", code, amount, None, n, f"pertama di baris {entries[code][1]}")
+                else: entries[code] = (Decimal(amount), n)
+
+        found = self._lookup(conn, list(entries))
+        for code, (amount, n) in entries.items():
+            if code not in found: self.issue("unknown", code, amount, None, n)
+            elif found[code] is None: self.issue("unpaid", code, amount, None, n)
+            else:
+                db_amount, status = found[code]
+                if status != 'Success': self.issue("status", code, amount, db_amount, n, status)
+                elif db_amount != amount: self.issue("amount", code, amount, db_amount, n, f"selisih {amount - db_amount}")
+                else: self.counts["matched"] += 1
+
+        if db_path:
+            with open(db_path, newline='', encoding='utf-8') as f:
+                for code, db_amount in csv.reader(f):
+                    if code not in entries: self.issue("missing", code, None, db_amount)
+
+    def run(self, entries, date_from=None, date_to=None) -> ReconcileReport:
+        with tempfile.TemporaryDirectory(prefix="reconcile-") as tmpdir, db_crud.read_engine().connect() as conn:
+            file_parts = self._split(self._file_rows(entries), tmpdir, "file")
+            check_missing = date_from is not None or date_to is not None
+            db_parts = self._split(self._db_rows(conn, date_from, date_to), tmpdir, "db") if check_missing \
+                else [None] * self.partitions
+            for file_path, db_path in zip(file_parts, db_parts):
+                self._join_partition(conn, file_path, db_path)
+        return ReconcileReport(**self.counts)
+
+def reconcile_settlement(path, issues_path, date_from=None, date_to=None, partitions=PARTITIONS,
+                         code_field="booking_code", amount_field="amount") -> ReconcileReport:
+    with open(issues_path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(ISSUE_COLUMNS)
+        return Reconciler(writer, partitions).run(iter_settlement(path, code_field, amount_field), date_from, date_to)
+
+def format_report(r: ReconcileReport) -> str:
+    return (f"{r.lines} baris | ✅ cocok {r.matched} | tidak dikenal {r.unknown} | belum dibayar {r.unpaid} | "
+            f"status beda {r.status} | nominal beda {r.amount} | duplikat {r.duplicate} | invalid {r.invalid} | "
+            f"tidak ada di file {r.missing}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Rekonsiliasi file settlement vs payments")
+    ap.add_argument("path", help="file settlement .csv atau .jsonl")
+    ap.add_argument("--out", default="reconcile_issues.csv", help="CSV daftar masalah")
+    ap.add_argument("--from", dest="date_from", type=datetime.fromisoformat,
+                    help="awal rentang payment_date untuk cek 'missing'")
+    ap.add_argument("--to", dest="date_to", type=datetime.fromisoformat, help="akhir rentang (eksklusif)")
+    ap.add_argument("--partitions", type=int, default=PARTITIONS)
+    ap.add_argument("--code-field", default="booking_code")
+    ap.add_argument("--amount-field", default="amount")
+    args = ap.parse_args()
+    rep = reconcile_settlement(args.path, args.out, args.date_from, args.date_to, args.partitions,
+                               args.code_field, args.amount_field)
+    print(format_report(rep))
+    print(f"Detail masalah: {args.out}")
+
+if __name__ == "__main__":
+    main()
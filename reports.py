@@ -0,0 +1,100 @@
+"""Laporan keuangan: agregasi di database per event, hari, dan metode bayar.
+
+Pendapatan, refund, dan jumlah tiket dihitung dengan satu GROUP BY atas
+payments x bookings x events (termasuk tabel arsip); Python hanya menerima baris agregat. Export
+di-stream ke CSV, atau Parquet kalau pyarrow terpasang.
+"""
+import csv
+from decimal import Decimal
+
+from sqlalchemy import case, func, select, union_all
+
+import db_crud
+from models import Booking, BookingArchive, Event, Payment, PaymentArchive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet opsional
+    pa = pq = None
+
+EXPORT_BATCH = 5000
+COLUMNS = ["event_id", "event_name", "day", "payment_method", "payments",
+           "gross", "refunds", "net", "tickets_sold", "tickets_refunded"]
+
+def _paid_bookings(pay, bk, date_from, date_to, event_id):
+    stmt = (select(pay.id, pay.amount, pay.payment_method, pay.payment_date, pay.status, bk.event_id, bk.quantity)
+            .join(bk, pay.booking_id == bk.id)
+            .where(*db_crud.date_range_filter(pay.payment_date, date_from, date_to)))
+    if event_id is not None: stmt = stmt.where(bk.event_id == event_id)
+    return stmt
+
+def revenue_report_stmt(date_from=None, date_to=None, event_id=None, include_archived=True):
+    # payments x bookings, plus tabel arsip (event lama) supaya total historis tidak berubah
+    p = _paid_bookings(Payment, Booking, date_from, date_to, event_id)
+    if include_archived:
+        p = union_all(p, _paid_bookings(PaymentArchive, BookingArchive, date_from, date_to, event_id))
+    p = p.subquery("p")
+
+    day = func.date(p.c.payment_date)
+    refunded = p.c.status == 'Refunded'
+    gross = func.coalesce(func.sum(p.c.amount), 0)
+    refunds = func.coalesce(func.sum(case((refunded, p.c.amount), else_=0)), 0)
+    return (select(Event.id.label("event_id"), Event.name.label("event_name"), day.label("day"),
+                   p.c.payment_method,
+                   func.count(p.c.id).label("payments"),
+                   gross.label("gross"), refunds.label("refunds"), (gross - refunds).label("net"),
+                   func.coalesce(func.sum(p.c.quantity), 0).label("tickets_sold"),
+                   func.coalesce(func.sum(case((refunded, p.c.quantity), else_=0)), 0).label("tickets_refunded"))
+            .join(Event, p.c.event_id == Event.id)
+            .group_by(Event.id, Event.name, day, p.c.payment_method)
+            .order_by(day, Event.id, p.c.payment_method))
+
+def iter_revenue_report(**filters):
+    """Stream baris agregat (Row) lewat server-side cursor."""
+    with db_crud.read_engine().connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_BATCH).execute(revenue_report_stmt(**filters))
+        yield from result
+
+def print_revenue_report(**filters):
+    print("\n--- LAPORAN KEUANGAN ---")
+    totals = dict.fromkeys(("gross", "refunds", "net", "tickets_sold", "tickets_refunded"), 0)
+    for r in iter_revenue_report(**filters):
+        print(f"{r.day} | [{r.event_id}] {r.event_name} | {r.payment_method} | {r.payments} trx | "
+              f"🎫 {r.tickets_sold - r.tickets_refunded} | +Rp {r.gross:,.0f} | -Rp {r.refunds:,.0f} | Net Rp {r.net:,.0f}")
+        for k in totals: totals[k] += getattr(r, k)
+    print(f"TOTAL: Bruto Rp {totals['gross']:,.0f} | Refund Rp {totals['refunds']:,.0f} | "
+          f"Net Rp {totals['net']:,.0f} | Tiket {totals['tickets_sold'] - totals['tickets_refunded']}")
+    return totals
+
+def export_revenue_csv(path, **filters) -> int:
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        for r in iter_revenue_report(**filters):
+            w.writerow(r); n += 1
+    return n
+
+def export_revenue_parquet(path, **filters) -> int:
+    if pa is None: raise RuntimeError("pyarrow tidak terpasang, pakai export CSV.")
+    money = pa.decimal128(18, 2)
+    schema = pa.schema([("event_id", pa.int64()), ("event_name", pa.string()), ("day", pa.string()),
+                        ("payment_method", pa.string()), ("payments", pa.int64()),
+                        ("gross", money), ("refunds", money), ("net", money),
+                        ("tickets_sold", pa.int64()), ("tickets_refunded", pa.int64())])
+    cent = Decimal("0.01")
+    n = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in db_crud.chunked(iter_revenue_report(**filters), EXPORT_BATCH):
+            cols = list(zip(*batch))
+            for i in (5, 6, 7): cols[i] = [Decimal(v).quantize(cent) for v in cols[i]]
+            cols[2] = [str(v) for v in cols[2]]
+            writer.write_batch(pa.record_batch(cols, schema=schema))
+            n += len(batch)
+    return n
+
+def export_revenue_report(path, **filters) -> int:
+    """Export ke CSV atau Parquet (dari ekstensi file), return jumlah baris."""
+    if path.lower().endswith(".parquet"): return export_revenue_parquet(path, **filters)
+    return export_revenue_csv(path, **filters)
@@ -0,0 +1,219 @@
+"""Cache ketersediaan kursi per event di memori (bitset + LRU).
+
+Dimuat sekali per event dari DB, lalu diupdate oleh jalur booking/cancel/refund
+di db_crud setelah commit. Peta kursi, hitungan kursi kosong, dan kandidat blok
+kursi berdampingan (FreeIntervals) dilayani dari sini.
+"""
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from models import Seat
+
+MAX_EVENTS = 64  # jumlah event yang disimpan sebelum LRU membuang yang terlama
+
+_DIGITS = re.compile(r'(\d+)')
+
+def natural_key(label: str):
+    """Urutan natural: S200 sebelum S1000, VIP02-010 sebelum VIP10-001."""
+    return [int(t) if t.isdigit() else t for t in _DIGITS.split(label)]
+
+class FreeIntervals:
+    """Interval kursi kosong berdampingan per baris (row_label, position).
+
+    _by_len berisi (panjang, urutan_baris, start) terurut, jadi blok N kursi
+    best-fit (interval terkecil yang cukup, baris depan dulu) dicari dengan bisect.
+    Per baris disimpan start interval terurut + start -> end (inklusif) untuk
+    memecah/menggabung interval saat kursi terisi/dilepas.
+    """
+    __slots__ = ('rows', '_rank', '_starts', '_ends', '_by_len')
+
+    def __init__(self, seats):
+        # seats: (row_label, position, is_booked); kursi tanpa baris/posisi diabaikan
+        seats = [s for s in seats if s[0] is not None and s[1] is not None]
+        self.rows = sorted({row for row, _, _ in seats}, key=natural_key)
+        self._rank = {row: i for i, row in enumerate(self.rows)}
+        self._starts = [[] for _ in self.rows]
+        self._ends = [{} for _ in self.rows]
+        self._by_len = []
+
+        run = None  # [rank, start, end] interval yang sedang dibangun
+        for rank, pos in sorted((self._rank[row], pos) for row, pos, booked in seats if not booked):
+            if run and run[0] == rank and run[2] == pos - 1:
+                run[2] = pos
+                continue
+            if run: self._add(*run)
+            run = [rank, pos, pos]
+        if run: self._add(*run)
+
+    def __len__(self):
+        return len(self._by_len)
+
+    def _add(self, rank, start, end):
+        insort(self._starts[rank], start)
+        self._ends[rank][start] = end
+        insort(self._by_len, (end - start + 1, rank, start))
+
+    def _remove(self, rank, start) -> int:
+        end = self._ends[rank].pop(start)
+        starts = self._starts[rank]
+        del starts[bisect_left(starts, start)]
+        del self._by_len[bisect_left(self._by_len, (end - start + 1, rank, start))]
+        return end
+
+    def _containing(self, rank, pos):
+        """Start interval kosong yang memuat pos, atau None."""
+        starts = self._starts[rank]
+        i = bisect_right(starts, pos) - 1
+        if i >= 0 and self._ends[rank][starts[i]] >= pos: return starts[i]
+        return None
+
+    def occupy(self, row, pos):
+        rank = self._rank.get(row)
+        if rank is None or pos is None: return
+        start = self._containing(rank, pos)
+        if start is None: return  # sudah terisi
+        end = self._remove(rank, start)
+        if start < pos: self._add(rank, start, pos - 1)
+        if pos < end: self._add(rank, pos + 1, end)
+
+    def release(self, row, pos):
+        rank = self._rank.get(row)
+        if rank is None or pos is None or self._containing(rank, pos) is not None: return
+        start = end = pos
+        left = self._containing(rank, pos - 1)
+        if left is not None:
+            start = left
+            self._remove(rank, left)
+        if pos + 1 in self._ends[rank]:
+            end = self._remove(rank, pos + 1)
+        self._add(rank, start, end)
+
+    def candidates(self, qty, limit=1) -> list[tuple[str, int]]:
+        """Sampai `limit` blok (row_label, posisi_awal) untuk qty kursi, terbaik dulu."""
+        i = bisect_left(self._by_len, (qty,))
+        return [(self.rows[rank], start) for _, rank, start in self._by_len[i:i + limit]]
+
+class SeatBitmap:
+    """Status kursi satu event: label urut natural + bitset (bit 1 = terisi)."""
+    __slots__ = ('labels', 'index', 'bits', 'booked', 'places', 'intervals')
+
+    def __init__(self, rows):
+        # rows: (seat_label, is_booked, row_label, position)
+        rows = sorted(rows, key=lambda r: natural_key(r[0]))
+        self.labels = [r[0] for r in rows]
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.places = [(r[2], r[3]) for r in rows]
+        self.intervals = FreeIntervals((row, pos, is_booked) for _, is_booked, row, pos in rows)
+        self.bits = bytearray((len(rows) + 7) // 8)
+        self.booked = 0
+        for i, r in enumerate(rows):
+            if r[1]: self._flip(i)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def free(self) -> int:
+        return len(self.labels) - self.booked
+
+    def is_booked(self, i: int) -> bool:
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def _flip(self, i):
+        self.bits[i >> 3] ^= 1 << (i & 7)
+        self.booked += 1 if self.is_booked(i) else -1
+
+    def mark(self, labels, booked: bool):
+        # Idempoten: bit yang sudah sesuai tidak diubah
+        for label in labels:
+            i = self.index.get(label)
+            if i is not None and self.is_booked(i) != booked:
+                self._flip(i)
+                row, pos = self.places[i]
+                if booked: self.intervals.occupy(row, pos)
+                else: self.intervals.release(row, pos)
+
+    def render(self, per_line=5) -> str:
+        cells = [f"{label}{'[X]' if self.is_booked(i) else '[O]'}" for i, label in enumerate(self.labels)]
+        return "\n".join("  ".join(cells[i:i + per_line]) for i in range(0, len(cells), per_line))
+
+class SeatCache:
+    """LRU SeatBitmap per event_id, thread-safe."""
+
+    def __init__(self, session_factory, max_events=MAX_EVENTS):
+        self.session_factory = session_factory
+        self.max_events = max_events
+        self._events = OrderedDict()
+        # Load berjalan di luar lock; mark() yang datang selama load dicatat di sini
+        # (event_id -> [jumlah_loader, log (labels, booked)]) lalu diulang ke hasil load.
+        self._loading = {}
+        self._epoch = 0  # naik setiap invalidate: hasil load yang dimulai sebelumnya tidak dipasang
+        self._lock = threading.Lock()
+
+    def _load(self, event_id, session=None):
+        own = session is None
+        if own: session = self.session_factory()
+        try:
+            rows = session.execute(select(Seat.seat_label, Seat.is_booked, Seat.row_label, Seat.position)
+                                   .where(Seat.event_id == event_id)).all()
+        finally:
+            if own: session.close()
+        return SeatBitmap(rows) if rows else None
+
+    def get(self, event_id, session=None) -> SeatBitmap | None:
+        """session: load lewat session caller (mis. transaksi booking) supaya tidak mengambil koneksi pool kedua."""
+        with self._lock:
+            bm = self._events.get(event_id)
+            if bm is not None:
+                self._events.move_to_end(event_id)
+                return bm
+            entry = self._loading.setdefault(event_id, [0, []])
+            entry[0] += 1
+            start, epoch = len(entry[1]), self._epoch
+
+        # Query DB tanpa lock: event lain & mark() dari booking tidak ikut menunggu
+        bm = None
+        try:
+            bm = self._load(event_id, session)
+        finally:
+            with self._lock:
+                entry[0] -= 1
+                if not entry[0] and self._loading.get(event_id) is entry: del self._loading[event_id]
+                if bm is not None:
+                    # Commit yang terjadi selama query mungkin belum terlihat di hasil load; mark idempoten
+                    for labels, booked in entry[1][start:]: bm.mark(labels, booked)
+                    if epoch == self._epoch:
+                        bm = self._events.setdefault(event_id, bm)  # loader lain lebih dulu: pakai miliknya
+                        self._events.move_to_end(event_id)
+                        while len(self._events) > self.max_events:
+                            self._events.popitem(last=False)
+        return bm
+
+    def free_count(self, event_id) -> int:
+        bm = self.get(event_id)
+        return bm.free if bm else 0
+
+    def find_block(self, event_id, qty, limit=1, session=None) -> list[tuple[str, int]]:
+        """Kandidat blok qty kursi berdampingan (row_label, posisi_awal), terbaik dulu."""
+        bm = self.get(event_id, session)
+        if bm is None: return []
+        with self._lock:  # mark() mengubah interval di bawah lock yang sama
+            return bm.intervals.candidates(qty, limit)
+
+    def mark(self, event_id, labels, booked: bool):
+        """Terapkan perubahan yang sudah di-commit; event yang belum di-cache (dan tidak sedang dimuat) dilewati."""
+        with self._lock:
+            bm = self._events.get(event_id)
+            if bm is not None: bm.mark(labels, booked)
+            entry = self._loading.get(event_id)
+            if entry: entry[1].append((list(labels), booked))
+
+    def invalidate(self, event_id=None):
+        with self._lock:
+            self._epoch += 1
+            if event_id is None: self._events.clear()
+            else: self._events.pop(event_id, None)
@@ -0,0 +1,135 @@
+"""Import user massal dari CSV (kolom: name,email,password[,role][,phone]).
+
+File di-stream per batch, bcrypt disebar ke process pool, insert per batch
+dengan ON CONFLICT (email) DO NOTHING. Email duplikat dilaporkan, bukan
+menggagalkan seluruh import. Memori dibatasi ~2 batch berapa pun besar file.
+
+    python user_import.py users.csv [--duplicates dup.csv]
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+import db_crud
+from db_crud import VALID_ROLES, chunked, hash_password
+from models import User
+
+IMPORT_BATCH = 1000
+
+class ImportReport(NamedTuple):
+    inserted: int
+    duplicates: int
+    invalid: int
+
+def _insert_ignore_stmt(dialect_name):
+    """INSERT ... ON CONFLICT (email) DO NOTHING RETURNING email, atau None kalau tidak didukung."""
+    dialect_insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(dialect_name)
+    if dialect_insert is None: return None
+    return dialect_insert(User).on_conflict_do_nothing(index_elements=['email']).returning(User.email)
+
+class UserImporter:
+    def __init__(self, batch_size=IMPORT_BATCH, workers=None, default_role='Customer', on_duplicate=None):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count()
+        self.default_role = default_role
+        self.on_duplicate = on_duplicate or (lambda email, reason: None)
+        self.inserted = self.duplicates = self.invalid = 0
+
+    def _prepare(self, session, batch) -> list[dict]:
+        """Validasi + buang duplikat (di batch & yang sudah ada di DB) sebelum hashing."""
+        rows, seen = [], set()
+        for r in batch:
+            email = (r.get('email') or '').strip()
+            role = (r.get('role') or '').strip() or self.default_role
+            if not email or not (r.get('name') or '').strip() or not r.get('password') or role not in VALID_ROLES:
+                self.invalid += 1
+                continue
+            if email in seen:
+                self._duplicate(email, "ganda di file")
+                continue
+            seen.add(email)
+            rows.append({"name": r['name'].strip(), "email": email, "password": r['password'],
+                         "role": role, "phone_number": (r.get('phone') or '').strip() or None})
+
+        # Satu query per batch; email yang sudah terdaftar tidak perlu di-hash
+        existing = set(session.scalars(select(User.email).where(User.email.in_(seen)))) if seen else set()
+        for email in existing: self._duplicate(email, "sudah terdaftar")
+        return [r for r in rows if r['email'] not in existing]
+
+    def _duplicate(self, email, reason):
+        self.duplicates += 1
+        self.on_duplicate(email, reason)
+
+    def _insert(self, session, rows, hashed):
+        for r, h in zip(rows, hashed): r['password'] = h
+        if not rows: return
+
+        stmt = _insert_ignore_stmt(session.get_bind().dialect.name)
+        if stmt is not None:
+            inserted = set(session.scalars(stmt, rows))
+            for r in rows:
+                if r['email'] not in inserted: self._duplicate(r['email'], "sudah terdaftar")
+            self.inserted += len(inserted)
+        else:
+            # Dialek tanpa ON CONFLICT: coba per batch, kalau bentrok ulang per baris
+            try:
+                with session.begin_nested(): session.execute(insert(User), rows)
+                self.inserted += len(rows)
+            except IntegrityError:
+                for r in rows:
+                    try:
+                        with session.begin_nested(): session.execute(insert(User), [r])
+                        self.inserted += 1
+                    except IntegrityError: self._duplicate(r['email'], "sudah terdaftar")
+        session.commit()
+
+    def run(self, lines) -> ImportReport:
+        """lines: iterable baris CSV (mis. file terbuka) dengan header."""
+        session = db_crud.Session()
+        try:
+            with ProcessPoolExecutor(self.workers) as pool:
+                prev = None
+                for batch in chunked(csv.DictReader(lines), self.batch_size):
+                    rows = self._prepare(session, batch)
+                    session.commit()
+                    # Hashing batch ini jalan di pool selagi batch sebelumnya di-insert
+                    chunksize = max(1, len(rows) // (self.workers * 4))
+                    cur = (rows, pool.map(hash_password, [r['password'] for r in rows], chunksize=chunksize))
+                    if prev: self._insert(session, *prev)
+                    prev = cur
+                if prev: self._insert(session, *prev)
+        except Exception:
+            session.rollback(); raise
+        finally: session.close()
+        return ImportReport(self.inserted, self.duplicates, self.invalid)
+
+def import_users_csv(path, duplicates_path=None, **kw) -> ImportReport:
+    dup_file = open(duplicates_path, 'w', newline='', encoding='utf-8') if duplicates_path else None
+    try:
+        if dup_file:
+            dup_writer = csv.writer(dup_file)
+            dup_writer.writerow(["email", "alasan"])
+            kw['on_duplicate'] = lambda email, reason: dup_writer.writerow([email, reason])
+        with open(path, newline='', encoding='utf-8') as f:
+            return UserImporter(**kw).run(f)
+    finally:
+        if dup_file: dup_file.close()
+
+def main():
+    ap = argparse.ArgumentParser(description="Import user massal dari CSV")
+    ap.add_argument("path")
+    ap.add_argument("--duplicates", help="tulis email duplikat ke CSV ini")
+    ap.add_argument("--batch", type=int, default=IMPORT_BATCH)
+    ap.add_argument("--workers", type=int)
+    args = ap.parse_args()
+    rep = import_users_csv(args.path, args.duplicates, batch_size=args.batch, workers=args.workers)
+    print(f"✅ Import selesai: {rep.inserted} user baru | {rep.duplicates} duplikat | {rep.invalid} baris invalid")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Ruang tunggu (waiting room) di depan jalur booking untuk event ramai.
+
+Pembeli mengambil tiket antrian FIFO per event (join), lalu polling status.
+Tiket diterima berurutan dengan laju terkontrol (token bucket, `rate` per detik,
+burst `burst`) dan paling banyak `max_active` pembeli sedang booking bersamaan,
+jadi DB melihat konkurensi stabil dekat pool size, bukan serbuan. Begitu kursi
+kosong event habis, semua yang menunggu langsung mendapat 'sold_out' tanpa
+menyentuh tabel seats.
+
+Slot aktif berupa lease (habis setelah `lease_ttl` detik) supaya pembeli yang
+menghilang tidak memegang slot selamanya.
+
+Backend:
+    MemoryBackend      satu proses (default, juga untuk test)
+    SqliteFileBackend  file sqlite3 lokal, dibagi antar proses di satu host
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from sqlalchemy import select
+
+import db_crud
+from models import Event
+
+ADMIT_RATE = float(os.environ.get("WAITING_ROOM_RATE", 50))     # tiket diterima per detik
+ADMIT_BURST = int(os.environ.get("WAITING_ROOM_BURST", 20))
+LEASE_TTL = float(os.environ.get("WAITING_ROOM_LEASE_TTL", 120))  # detik slot aktif berlaku
+SOLD_OUT_RECHECK = 5.0  # detik antar baca kursi kosong dari DB per event; kursi bisa kembali (cancel/hold habis)
+
+class Ticket(NamedTuple):
+    event_id: int
+    number: int
+
+class Admission(NamedTuple):
+    state: str              # 'waiting' / 'admitted' / 'sold_out'
+    position: int = 0       # jumlah tiket di depan (hanya 'waiting')
+    eta: float | None = None  # perkiraan detik sampai diterima
+
+class RoomState:
+    __slots__ = ('issued', 'admitted', 'tokens', 'refilled_at', 'leases', 'free', 'free_checked_at')
+
+    def __init__(self, issued=0, admitted=0, tokens=0.0, refilled_at=0.0, leases=None, free=None, free_checked_at=0.0):
+        self.issued = issued            # nomor tiket terakhir yang dibagikan
+        self.admitted = admitted        # semua tiket <= nomor ini sudah diterima
+        self.tokens = tokens
+        self.refilled_at = refilled_at
+        self.leases = leases or {}      # nomor tiket -> waktu lease habis
+        self.free = free                # kursi kosong saat terakhir dibaca (None = belum pernah)
+        self.free_checked_at = free_checked_at
+
+    def to_json(self) -> str:
+        return json.dumps({s: getattr(self, s) for s in self.__slots__})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "RoomState":
+        data = json.loads(raw)
+        data["leases"] = {int(k): v for k, v in data["leases"].items()}
+        return cls(**{k: v for k, v in data.items() if k in cls.__slots__})  # field lama diabaikan
+
+class MemoryBackend:
+    def __init__(self):
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self, event_id):
+        with self._lock:
+            yield self._rooms.setdefault(event_id, RoomState())
+
+class SqliteFileBackend:
+    """State per event sebagai JSON di file sqlite3; BEGIN IMMEDIATE = kunci tulis antar proses."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rooms (event_id INTEGER PRIMARY KEY, state TEXT NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return conn
+
+    @contextmanager
+    def transaction(self, event_id):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT state FROM rooms WHERE event_id = ?", (event_id,)).fetchone()
+            state = RoomState.from_json(row[0]) if row else RoomState()
+            yield state
+            conn.execute("INSERT OR REPLACE INTO rooms (event_id, state) VALUES (?, ?)", (event_id, state.to_json()))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+def db_free_seats(event_id) -> int:
+    """Kursi kosong dari counter di tabel events (satu baca primary key, selalu dari primary).
+
+    Bukan seat_map_cache: cache itu per proses, jadi kursi yang dilepas proses lain
+    (worker lain, hold_reaper CLI, cancel/refund) tidak terlihat dan event tampak sold out terus.
+    """
+    session = db_crud.Session()
+    try:
+        return session.scalar(select(Event.seats_total - Event.seats_booked).where(Event.id == event_id)) or 0
+    finally: session.close()
+
+class WaitingRoom:
+    def __init__(self, backend=None, rate=ADMIT_RATE, burst=ADMIT_BURST, max_active=None,
+                 lease_ttl=LEASE_TTL, free_seats=None):
+        self.backend = backend or MemoryBackend()
+        self.rate = rate
+        self.burst = burst
+        # Default: sebanyak koneksi pool primary, titik jenuh DB untuk satu proses
+        self.max_active = max_active or db_crud.config.pool_size + db_crud.config.max_overflow
+        self.lease_ttl = lease_ttl
+        self.free_seats = free_seats or db_free_seats
+
+    def join(self, event_id) -> Ticket:
+        with self.backend.transaction(event_id) as st:
+            st.issued += 1
+            return Ticket(event_id, st.issued)
+
+
+    def _admit(self, st, now):
+        """Token bucket + batas slot aktif; tiket diterima sesuai urutan nomor."""
+        st.tokens = min(self.burst, st.tokens + (now - st.refilled_at) * self.rate) if st.refilled_at else self.burst
+        st.refilled_at = now
+        n = min(int(st.tokens), self.max_active - len(st.leases), st.issued - st.admitted)
+        for number in range(st.admitted + 1, st.admitted + n + 1):
+            st.leases[number] = now + self.lease_ttl
+        st.admitted += max(n, 0)
+        st.tokens -= max(n, 0)
+
+    def poll(self, ticket: Ticket) -> Admission:
+        now = time.time()
+        with self.backend.transaction(ticket.event_id) as st:
+            if now - st.free_checked_at < SOLD_OUT_RECHECK: return self._poll(st, ticket, now)
+            st.free_checked_at = now  # poller lain memakai nilai lama sampai periode berikutnya
+        # Paling sering sekali per SOLD_OUT_RECHECK per event, dan di luar lock room
+        free = self.free_seats(ticket.event_id)
+        with self.backend.transaction(ticket.event_id) as st:
+            st.free = free
+            return self._poll(st, ticket, now)
+
+    def _poll(self, st, ticket, now) -> Admission:
+        st.leases = {n: exp for n, exp in st.leases.items() if exp > now}
+        if ticket.number in st.leases: return Admission('admitted')
+        if st.free is not None and st.free <= 0: return Admission('sold_out')
+        if ticket.number <= st.admitted:
+            # Sudah pernah diterima tapi lease habis: butuh slot aktif lagi, supaya max_active tetap berlaku
+            if len(st.leases) >= self.max_active: return Admission('waiting', 0, None)
+            st.leases[ticket.number] = now + self.lease_ttl
+            return Admission('admitted')
+        self._admit(st, now)
+        if ticket.number <= st.admitted: return Admission('admitted')
+        ahead = ticket.number - st.admitted - 1
+        return Admission('waiting', ahead, ahead / self.rate if self.rate else None)
+
+    def leave(self, ticket: Ticket, sold_out=False, booked=0):
+        """Lepas slot aktif (booking selesai/gagal); sold_out=True kalau booking gagal karena kursi habis.
+
+        booked: kursi yang baru dibooking, dikurangkan dari hitungan kursi kosong sampai baca DB berikutnya.
+        """
+        with self.backend.transaction(ticket.event_id) as st:
+            st.leases.pop(ticket.number, None)
+            if sold_out: st.free, st.free_checked_at = 0, time.time()
+            elif booked and st.free is not None: st.free -= booked
+
+    def wait(self, event_id, timeout=None, interval=0.05) -> tuple[Ticket, Admission]:
+        """Join lalu polling sampai diterima / sold out / timeout (state 'waiting')."""
+        ticket = self.join(event_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            adm = self.poll(ticket)
+            if adm.state != 'waiting' or (deadline is not None and time.monotonic() >= deadline):
+                return ticket, adm
+            time.sleep(min(max(interval, adm.eta or 0), 1.0))
+
+    def book(self, ticket: Ticket, email, qty, adjacent=False) -> db_crud.BookingResult:
+        """book_seats untuk tiket yang sudah diterima; slot dilepas apa pun hasilnya."""
+        if self.poll(ticket).state != 'admitted': raise ValueError("Belum giliran tiket ini.")
+        sold_out, booked = False, 0
+        try:
+            res = db_crud.book_seats(email, ticket.event_id, qty, adjacent)
+            booked = len(res.seats)
+            return res
+        except ValueError as e:
+            sold_out = "Kursi kurang" in str(e) and self.free_seats(ticket.event_id) <= 0
+            raise
+        finally:
+            self.leave(ticket, sold_out, booked)